@@ -0,0 +1,78 @@
+"""Compare the per-line regex kemono parser with the single-pass scanner.
+
+python -m benchmarks.bench_kemono
+"""
+
+import re
+
+from benchmarks.utils import bench, report
+from src.api.kemono import KemonoApi
+from src.api.models import (
+    FanboxPostBody,
+    FanboxPostBodyBlock,
+    FanboxPostBodyBlockType,
+    KemonoPost,
+    KemonoPostPreview,
+)
+
+
+def make_kemono_post(lines: int) -> KemonoPost:
+    content = []
+    for i in range(lines):
+        if i % 5 == 0:
+            content.append(f'<p><img src="https://kemono.su/data/aa/bb/{i}.png"></p>')
+        elif i % 5 == 1:
+            content.append("<p><br></p>")
+        else:
+            content.append("<p>" + f"line {i} <strong>bold</strong> text " * 4 + "</p>")
+    return KemonoPost(
+        post={"id": "1", "user": "1", "title": "bench", "content": "\n".join(content)},
+        previews=[
+            {"name": f"{i}.png", "path": f"/aa/bb/{i}.png", "type": "thumbnail"}
+            for i in range(lines // 10)
+        ],
+    )
+
+
+def legacy_extract_img_src_and_clean_p(p_content: str):
+    img_pattern = re.compile(r'<img\s+[^>]*src=(["\'])(.*?)\1[^>]*>', re.IGNORECASE)
+    img_matches = img_pattern.finditer(p_content)
+    img_src_list = [match.group(2) for match in img_matches]
+    cleaned_p = img_pattern.sub("", p_content)
+    return img_src_list, cleaned_p
+
+
+def legacy_parse_kemono_post(post: KemonoPost) -> FanboxPostBody:
+    blocks = []
+    image_maps = {}
+    if post.post.content:
+        for p in post.post.content.split("\n"):
+            img_src_list, cleaned_p = legacy_extract_img_src_and_clean_p(p)
+            blocks.append(
+                FanboxPostBodyBlock(type=FanboxPostBodyBlockType.P, text=cleaned_p)
+            )
+            for img_src in img_src_list:
+                KemonoApi.parse_kemono_post_preview(
+                    KemonoPostPreview.from_src(img_src), blocks, image_maps
+                )
+    if post.previews:
+        for preview in post.previews:
+            KemonoApi.parse_kemono_post_preview(preview, blocks, image_maps)
+    return FanboxPostBody(blocks=blocks, imageMap=image_maps)
+
+
+def main():
+    for lines in (100, 1000, 10000):
+        post = make_kemono_post(lines)
+        old_blocks = len(legacy_parse_kemono_post(post).blocks)
+        new_blocks = len(KemonoApi.parse_kemono_post(post).blocks)
+        report(
+            f"parse_kemono_post {lines} lines",
+            bench(lambda: legacy_parse_kemono_post(post)),
+            bench(lambda: KemonoApi.parse_kemono_post(post)),
+        )
+        print(f"{'':<32} blocks {old_blocks} -> {new_blocks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Drive the app under concurrent load against a local fake upstream.
+
+python -m benchmarks.bench_load --requests 2000 --concurrency 50
+python -m benchmarks.bench_load --save baseline.json
+python -m benchmarks.bench_load --baseline baseline.json
+
+Requests pick post ids from a Zipf-like distribution so the caches see a
+realistic mix of hot and cold posts. Env settings (POST_CACHE_*, HTTP_*, ...)
+apply as usual.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.upstream import FakeUpstream, LocalUpstreamTransport, UpstreamConfig
+from src.api.cache import PageCache, PostCache
+from src.api.fanbox import FanBoxApi
+from src.api.httpxrequest import HTTPXRequest
+from src.api.kemono import KemonoApi
+from src.api.prefetch import Prefetcher
+from src.api.refresh import RefreshQueue
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.route.article import ArticlePlugin
+from src.route.batch import BatchPlugin
+
+
+def build_app(port: int) -> WebApp:
+    """Wire the serving components by hand, like the DI container would."""
+    request = HTTPXRequest(
+        transport=LocalUpstreamTransport(port, limits=HTTPXRequest.get_limits())
+    )
+    render = RenderArticle(
+        FanBoxApi(request),
+        KemonoApi(request),
+        PostCache(),
+        PageCache(),
+        RefreshQueue(),
+    )
+    web_app = WebApp()
+    ArticlePlugin(web_app, render, Prefetcher(render))
+    BatchPlugin(web_app, render)
+    return web_app
+
+
+def get_post_ids(count: int, posts: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(posts)]
+    return [
+        str(1000000 + i) for i in rng.choices(range(posts), weights=weights, k=count)
+    ]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def run(args: argparse.Namespace, port: int) -> Dict[str, Any]:
+    web_app = build_app(port)
+    transport = httpx.ASGITransport(app=web_app.app)
+    post_ids = get_post_ids(args.requests, args.posts, args.seed)
+    suffix = "/json" if args.json else ""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for post_id in post_ids:
+        queue.put_nowait(post_id)
+
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+        headers={"user-agent": "TelegramBot"},
+    ) as client:
+
+        async def worker():
+            while not queue.empty():
+                post_id = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(f"/posts/{post_id}{suffix}")
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = (
+                    statuses.get(response.status_code, 0) + 1
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        # ru_maxrss is KiB on linux
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def print_report(result: Dict[str, Any], baseline: Dict[str, Any] = None) -> None:
+    rows = (
+        ("throughput", "req/s", True),
+        ("p50", "ms", False),
+        ("p95", "ms", False),
+        ("p99", "ms", False),
+        ("max_rss_mb", "MiB", False),
+    )
+    print(
+        f"requests {result['requests']} in {result['elapsed']:.2f}s  {result['statuses']}"
+    )
+    for key, unit, higher_is_better in rows:
+        line = f"{key:<12} {result[key]:>10.1f} {unit}"
+        if baseline is not None:
+            old = baseline[key]
+            change = (
+                (result[key] / old if higher_is_better else old / result[key])
+                if old and result[key]
+                else 0
+            )
+            line += f"  baseline {old:>10.1f}  x{change:.2f}"
+        print(line)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=200, help="distinct post ids")
+    parser.add_argument("--json", action="store_true", help="hit /posts/{id}/json")
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--blocks", type=int, default=60, help="blocks per post")
+    parser.add_argument("--kemono-lines", type=int, default=200)
+    parser.add_argument("--paid-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the result as json")
+    parser.add_argument("--baseline", help="compare with a saved result")
+    args = parser.parse_args(argv)
+
+    upstream = FakeUpstream(
+        UpstreamConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            blocks=args.blocks,
+            kemono_lines=args.kemono_lines,
+            paid_ratio=args.paid_ratio,
+            seed=args.seed,
+        )
+    )
+    port = upstream.start()
+    try:
+        result = asyncio.run(run(args, port))
+    finally:
+        upstream.stop()
+    result["upstream_requests"] = upstream.requests
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    print(f"upstream     {upstream.requests}")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Compare dict based post construction with validate_json on the raw bytes.
+
+python -m benchmarks.bench_models
+"""
+
+import json
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+from pydantic import BaseModel, model_validator
+
+from benchmarks.utils import bench, make_post_data, report
+from src.api.models import (
+    FanboxPost,
+    FanboxPostBody,
+    FanboxPostBodyBlockType,
+    FanboxPostResponse,
+)
+
+
+class LegacyBlock(BaseModel):
+    type: FanboxPostBodyBlockType = FanboxPostBodyBlockType.UNKNOWN
+    raw_type: str = ""
+    text: Optional[str] = None
+    imageId: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def before(cls, values: Any) -> Any:
+        old_type = values.get("type")
+        if isinstance(old_type, FanboxPostBodyBlockType):
+            values["raw_type"] = old_type.value
+        else:
+            values["raw_type"] = old_type
+            try:
+                values["type"] = FanboxPostBodyBlockType(values["raw_type"])
+            except ValueError:
+                values["type"] = FanboxPostBodyBlockType.UNKNOWN
+        return values
+
+
+class LegacyBody(FanboxPostBody):
+    blocks: Optional[List[LegacyBlock]] = None
+
+
+class LegacyPost(FanboxPost):
+    body: Optional[LegacyBody] = None
+
+
+def legacy_parse(raw: bytes) -> FanboxPost:
+    return LegacyPost(**(json.loads(raw)["body"]))
+
+
+def parse(raw: bytes) -> FanboxPost:
+    return FanboxPostResponse.model_validate_json(raw).body
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    for blocks in (10, 100, 1000):
+        raw = json.dumps({"body": make_post_data(blocks)}).encode()
+        assert legacy_parse(raw).model_dump() == parse(raw).model_dump()
+        report(
+            f"post.info {blocks} blocks",
+            bench(lambda: legacy_parse(raw)),
+            bench(lambda: parse(raw)),
+        )
+        old, new = (
+            peak_memory(lambda: legacy_parse(raw)),
+            peak_memory(lambda: parse(raw)),
+        )
+        print(f"{'':<32} peak alloc {old / 1024:.1f} KiB -> {new / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the string-concatenation renderer with the fragment renderer.
+
+python -m benchmarks.bench_render
+"""
+
+import asyncio
+
+import jinja2
+
+from benchmarks.utils import bench, make_post, report
+from src.api.models import FanboxPost, FanboxPostBodyBlockType
+from src.api.render import RenderArticle
+
+LEGACY_TEMPLATE = jinja2.Environment(
+    loader=jinja2.DictLoader(
+        {
+            "article.jinja2": open("src/templates/article.jinja2", encoding="utf-8")
+            .read()
+            .replace(
+                "{% for fragment in article %}{{ fragment }}{% endfor %}",
+                "{{ article }}",
+            )
+        }
+    )
+).get_template("article.jinja2")
+
+
+def legacy_parse_content(post_info: "FanboxPost") -> str:
+    text = ""
+    data = post_info.body
+    if not data:
+        return text
+    if data.images:
+        for img in data.images:
+            text += f'<img src="{img.thumbnailUrl}"/><br/>\n'
+    if data.blocks:
+        for item in data.blocks:
+            if item.type is FanboxPostBodyBlockType.P:
+                text += f"<p>{item.text}</p><br/>\n"
+            elif item.type is FanboxPostBodyBlockType.IMAGE:
+                text += (
+                    f'<img src="{data.imageMap[item.imageId].thumbnailUrl}"/><br/>\n'
+                )
+            elif item.type is FanboxPostBodyBlockType.HEADER:
+                text += f"<h2>{item.text}</h2><br/>\n"
+    elif data.text:
+        text += f"<p>{data.text}</p><br/>\n"
+    return text
+
+
+def legacy_render(post_info: "FanboxPost") -> str:
+    return LEGACY_TEMPLATE.render(
+        published_time=post_info.create_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        channel="shota_audio",
+        post=post_info,
+        author=post_info.user,
+        description=post_info.excerpt.strip(),
+        image_for_share=post_info.imageForShare,
+        icon_url=post_info.user.iconUrl,
+        article=legacy_parse_content(post_info),
+    )
+
+
+async def first_chunk(render: RenderArticle, post_info: "FanboxPost") -> bytes:
+    stream = render.stream_article(post_info)
+    chunk = await anext(stream)
+    await stream.aclose()
+    return chunk
+
+
+def main():
+    render = RenderArticle.__new__(RenderArticle)
+    render.template = jinja2.Environment(
+        loader=jinja2.FileSystemLoader("src/templates")
+    ).get_template("article.jinja2")
+    loop = asyncio.new_event_loop()
+    for blocks in (10, 100, 1000):
+        post = make_post(blocks)
+        assert legacy_render(post) == loop.run_until_complete(
+            render.process_article_text(post)
+        )
+        report(
+            f"parse_content {blocks} blocks",
+            bench(lambda: legacy_parse_content(post)),
+            bench(lambda: render.parse_content(post)),
+        )
+        report(
+            f"full render {blocks} blocks",
+            bench(lambda: legacy_render(post)),
+            bench(lambda: render.template.render(**render.get_template_data(post))),
+        )
+        report(
+            f"time to <head> {blocks} blocks",
+            bench(lambda: legacy_render(post)),
+            bench(lambda: loop.run_until_complete(first_chunk(render, post))),
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
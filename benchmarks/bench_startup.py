@@ -0,0 +1,77 @@
+"""Measure the cold start import cost of the serverless entry point.
+
+python -m benchmarks.bench_startup
+python -m benchmarks.bench_startup --module main --runs 5 --top 20
+
+Every run is a fresh interpreter, so nothing is shared between runs except
+the __pycache__ directories. -X importtime of the last run lists the modules
+with the largest cumulative import time.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def run_once(module: str, importtime: bool = False) -> Tuple[float, str]:
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    env = dict(os.environ, START_WEB="false")
+    result = subprocess.run(
+        args + ["-c", CODE.format(module=module)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str]]:
+    """(cumulative us, module) pairs from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return rows
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="worker")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    # the first run fills __pycache__, like the build step does
+    run_once(args.module)
+    times = [run_once(args.module)[0] for _ in range(args.runs)]
+    print(
+        f"import {args.module}: median {statistics.median(times) * 1000:.1f} ms"
+        f"  min {min(times) * 1000:.1f} ms  max {max(times) * 1000:.1f} ms"
+    )
+    if args.top:
+        _, stderr = run_once(args.module, importtime=True)
+        rows = sorted(parse_importtime(stderr), reverse=True)[: args.top]
+        for cumulative, name in rows:
+            print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Local stand-in for api.fanbox.cc and kemono.su.
+
+Serves creator.get, post.info and the kemono post API with configurable
+latency, error rate and payload size. LocalUpstreamTransport rewrites the
+real upstream urls to it, so the app keeps its per-host pools and guards.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from benchmarks.utils import make_post_data
+
+
+@dataclass
+class UpstreamConfig:
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    blocks: int = 60
+    kemono_lines: int = 200
+    paid_ratio: float = 0.3
+    seed: int = 0
+
+
+class FakeUpstream:
+    def __init__(self, config: UpstreamConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.requests: Dict[str, int] = {}
+        self.payloads: Dict[str, bytes] = {}
+        self.app = Starlette(
+            routes=[
+                Route("/creator.get", self.creator_get),
+                Route("/post.info", self.post_info),
+                Route("/api/v1/fanbox/user/{user}/post/{post}", self.kemono_post),
+            ]
+        )
+
+    async def delay(self, name: str) -> bool:
+        """Sleep for the configured latency, returns False for an injected error."""
+        self.requests[name] = self.requests.get(name, 0) + 1
+        latency = self.config.latency + self.random.uniform(0, self.config.jitter)
+        await asyncio.sleep(latency)
+        return self.random.random() >= self.config.error_rate
+
+    def is_paid(self, post_id: str) -> bool:
+        return random.Random(post_id).random() < self.config.paid_ratio
+
+    def get_post_payload(self, post_id: str) -> bytes:
+        payload = self.payloads.get(post_id)
+        if payload is None:
+            data = make_post_data(self.config.blocks, post_id)
+            data["feeRequired"] = 500 if self.is_paid(post_id) else 0
+            data["nextPost"] = {
+                "id": str(int(post_id) + 1),
+                "publishedDatetime": data["publishedDatetime"],
+                "title": "next",
+            }
+            payload = self.payloads[post_id] = json.dumps({"body": data}).encode()
+        return payload
+
+    async def creator_get(self, request: Request) -> Response:
+        if not await self.delay("creator.get"):
+            return Response(status_code=503)
+        creator_id = request.query_params["creatorId"]
+        body = {
+            "coverImageUrl": None,
+            "creatorId": creator_id,
+            "description": "bench",
+            "hasAdultContent": False,
+            "user": {"name": "bench", "userId": "1", "iconUrl": None},
+        }
+        return Response(json.dumps({"body": body}), media_type="application/json")
+
+    async def post_info(self, request: Request) -> Response:
+        if not await self.delay("post.info"):
+            return Response(status_code=503)
+        post_id = request.query_params["postId"]
+        return Response(self.get_post_payload(post_id), media_type="application/json")
+
+    async def kemono_post(self, request: Request) -> Response:
+        if not await self.delay("kemono"):
+            return Response(status_code=503)
+        post_id = request.path_params["post"]
+        content = "\n".join(
+            f"<p>line {i} of {post_id} <strong>bold</strong> text</p>"
+            if i % 10
+            else f'<p><img src="https://kemono.su/data/aa/bb/{i}.png"></p>'
+            for i in range(self.config.kemono_lines)
+        )
+        body = {
+            "post": {
+                "id": post_id,
+                "user": request.path_params["user"],
+                "title": "bench",
+                "content": content,
+            },
+            "previews": [],
+        }
+        return Response(json.dumps(body), media_type="application/json")
+
+    def start(self, port: int = 0) -> int:
+        """Serve on a background thread with its own event loop, returns the port."""
+        config = uvicorn.Config(
+            self.app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+        )
+        self.server = uvicorn.Server(config)
+        thread = threading.Thread(target=self.server.run, daemon=True)
+        thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self.server.servers[0].sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+
+
+class LocalUpstreamTransport(httpx.AsyncHTTPTransport):
+    """Send every request to the local fake upstream, the Host header keeps
+    the original upstream name."""
+
+    def __init__(self, port: int, **kwargs):
+        super().__init__(**kwargs)
+        self.port = port
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(
+            scheme="http", host="127.0.0.1", port=self.port
+        )
+        return await super().handle_async_request(request)
@@ -0,0 +1,64 @@
+import time
+from typing import Any, Callable, Dict, List
+
+from src.api.models import FanboxPost
+
+
+def make_post_data(blocks: int, post_id: str = "1000000") -> Dict[str, Any]:
+    """Synthetic post.info body with `blocks` alternating p/image/header blocks."""
+    body_blocks: List[Dict[str, Any]] = []
+    image_map: Dict[str, Dict[str, Any]] = {}
+    for i in range(blocks):
+        kind = i % 3
+        if kind == 0:
+            body_blocks.append({"type": "p", "text": f"paragraph {i} " * 8})
+        elif kind == 1:
+            image_id = f"image{i}"
+            body_blocks.append({"type": "image", "imageId": image_id})
+            image_map[image_id] = {
+                "id": image_id,
+                "extension": "png",
+                "width": 1200,
+                "height": 1600,
+                "originalUrl": f"https://downloads.fanbox.cc/images/post/{post_id}/{image_id}.png",
+                "thumbnailUrl": f"https://downloads.fanbox.cc/images/post/{post_id}/w/1200/{image_id}.jpeg",
+            }
+        else:
+            body_blocks.append({"type": "header", "text": f"header {i}"})
+    return {
+        "id": post_id,
+        "publishedDatetime": "2022-10-05T20:21:19+09:00",
+        "title": "benchmark post",
+        "body": {"blocks": body_blocks, "imageMap": image_map},
+        "imageForShare": "https://pixiv.pximg.net/c/1200x630/fanbox/public/images/post/1/cover.jpeg",
+        "creatorId": "bench",
+        "excerpt": "benchmark excerpt",
+        "feeRequired": 0,
+        "likeCount": 10,
+        "user": {"name": "bench", "userId": "1", "iconUrl": None},
+        "nextPost": None,
+        "prevPost": None,
+    }
+
+
+def make_post(blocks: int) -> FanboxPost:
+    return FanboxPost(**make_post_data(blocks))
+
+
+def bench(func: Callable[[], Any], min_time: float = 0.5) -> float:
+    """Return the mean seconds per call, looping for at least min_time."""
+    func()
+    loops, total = 0, 0.0
+    while total < min_time:
+        start = time.perf_counter()
+        func()
+        total += time.perf_counter() - start
+        loops += 1
+    return total / loops
+
+
+def report(name: str, old: float, new: float) -> None:
+    print(
+        f"{name:<32} old {old * 1e6:>10.1f} us  new {new * 1e6:>10.1f} us  "
+        f"x{old / new:.2f}"
+    )
@@ -1,3 +1,20 @@
+import os
+
 import jinja2
 
-template_env = jinja2.Environment(loader=jinja2.FileSystemLoader("src/templates"))
+TEMPLATE_PATH = "src/templates"
+COMPILED_TEMPLATE_PATH = "src/templates/compiled"
+
+
+def get_template_loader() -> jinja2.BaseLoader:
+    """Prefer templates precompiled by `python -m src.compile_templates`, they
+    skip the lexer, parser and code generator on a cold start."""
+    loader = jinja2.FileSystemLoader(TEMPLATE_PATH)
+    if os.path.isdir(COMPILED_TEMPLATE_PATH):
+        return jinja2.ChoiceLoader(
+            [jinja2.ModuleLoader(COMPILED_TEMPLATE_PATH), loader]
+        )
+    return loader
+
+
+template_env = jinja2.Environment(loader=get_template_loader())
@@ -0,0 +1,141 @@
+import asyncio
+import enum
+import time
+from typing import Optional
+
+import httpx
+
+from src.api.httpxrequest import HTTPXRequest, get_remaining
+from src.env import env_config
+from src.error import APIHelperTimedOut, CircuitOpenError
+
+__all__ = ("CircuitState", "CircuitBreaker", "AdaptiveRateLimiter", "UpstreamGuard")
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self, failure_threshold: int, reset_timeout: float, half_open_max: int = 1
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+    def allow(self) -> bool:
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.probes = 0
+        if self.state is CircuitState.HALF_OPEN:
+            if self.probes >= self.half_open_max:
+                return False
+            self.probes += 1
+        return True
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate halves on throttling and slowly recovers (AIMD)."""
+
+    def __init__(self, rate: float, min_rate: float, burst: Optional[int] = None):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def get_delay(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        delay = max(self.blocked_until - now, 0)
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return delay
+
+    async def acquire(self) -> None:
+        delay = self.get_delay()
+        if delay > 0:
+            remaining = get_remaining()
+            if remaining is not None and delay >= remaining:
+                raise APIHelperTimedOut("Rate limit wait exceeds the request deadline")
+            await asyncio.sleep(delay)
+            self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def recover(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class UpstreamGuard:
+    """Circuit breaker plus adaptive rate limiter in front of one upstream."""
+
+    def __init__(self, name: str, rate: float):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            env_config.BREAKER_FAILURE_THRESHOLD,
+            env_config.BREAKER_RESET_TIMEOUT,
+            env_config.BREAKER_HALF_OPEN_MAX,
+        )
+        self.limiter = AdaptiveRateLimiter(rate, env_config.RATE_LIMIT_MIN)
+
+    @property
+    def is_open(self) -> bool:
+        return self.breaker.state is CircuitState.OPEN
+
+    @staticmethod
+    def get_retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            return float(response.headers.get("retry-after", ""))
+        except ValueError:
+            return None
+
+    async def get(self, request: HTTPXRequest, url: str, **kwargs) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name)
+        await self.limiter.acquire()
+        try:
+            response = await request.get(url, **kwargs)
+        except (httpx.TransportError, APIHelperTimedOut):
+            self.breaker.record_failure()
+            raise
+        if response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure()
+            self.limiter.throttle(self.get_retry_after(response))
+        else:
+            self.breaker.record_success()
+            self.limiter.recover()
+        return response
@@ -0,0 +1,341 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Generic, TypeVar, Dict
+
+from persica.factory.component import AsyncInitializingComponent
+
+from src.api.compression import compress
+from src.api.models import FanboxPost
+from src.env import env_config
+from src.log import logger
+
+__all__ = (
+    "CacheEntry",
+    "LRUCache",
+    "SQLiteStore",
+    "FileCache",
+    "PostCache",
+    "RenderedPage",
+    "PageCache",
+    "get_ttl",
+)
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    value: T
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+
+@dataclass
+class RenderedPage:
+    body: bytes
+    etag: str
+    last_modified: float
+    fee_required: bool
+    # compressed variants, each encoding is produced once per page
+    encodings: Dict[str, bytes] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_body(cls, body: bytes, fee_required: bool) -> "RenderedPage":
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return cls(body, etag, time.time(), fee_required)
+
+    def get_body(self, encoding: Optional[str] = None) -> bytes:
+        if encoding is None:
+            return self.body
+        body = self.encodings.get(encoding)
+        if body is None:
+            body = self.encodings[encoding] = compress(self.body, encoding)
+        return body
+
+    def get_etag(self, encoding: Optional[str] = None) -> str:
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def get_ttl(fee_required: int) -> int:
+    if fee_required:
+        return env_config.POST_CACHE_FEE_TTL
+    return env_config.POST_CACHE_TTL
+
+
+class LRUCache(Generic[T]):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self._data: "OrderedDict[str, CacheEntry[T]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[CacheEntry[T]]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry[T]) -> None:
+        if self.max_size <= 0:
+            return
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [i for i in self._data if i.startswith(prefix)]:
+            del self._data[key]
+
+
+class SQLiteStore:
+    """Local on-disk store, entries are kept as serialized bytes."""
+
+    def __init__(self, path: str, table: str = "posts"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry[bytes]]:
+        row = self.conn.execute(
+            f"SELECT value, stored_at, expires_at FROM {self.table} WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(value=row[0], stored_at=row[1], expires_at=row[2])
+
+    def set(self, key: str, entry: CacheEntry[bytes]) -> None:
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, entry.value, entry.stored_at, entry.expires_at),
+        )
+
+    def delete(self, key: str) -> None:
+        self.conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def prune(self, before: float) -> int:
+        cursor = self.conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at < ?", (before,)
+        )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class FileCache:
+    """Files on local disk evicted in LRU order once they exceed max_size bytes.
+
+    Entries are written to a temp file first and moved in place on commit, the
+    access order survives restarts through the file mtime.
+    """
+
+    def __init__(self, path: str, max_size: int):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.size = 0
+        self.evictions = 0
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        files = [i for i in self.path.iterdir() if i.is_file()]
+        for file in sorted(files, key=lambda i: i.stat().st_mtime):
+            if file.suffix == ".tmp":
+                file.unlink(missing_ok=True)
+                continue
+            size = file.stat().st_size
+            self._files[file.name] = size
+            self.size += size
+        self.evict()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, key: str) -> Optional[Path]:
+        if key not in self._files:
+            return None
+        file = self.path / key
+        try:
+            os.utime(file)
+        except FileNotFoundError:
+            self.size -= self._files.pop(key)
+            return None
+        self._files.move_to_end(key)
+        return file
+
+    def get_temp_path(self) -> Path:
+        fd, name = tempfile.mkstemp(suffix=".tmp", dir=self.path)
+        os.close(fd)
+        return Path(name)
+
+    def commit(self, key: str, temp_path: Path) -> Path:
+        file = self.path / key
+        os.replace(temp_path, file)
+        size = file.stat().st_size
+        self.size += size - self._files.pop(key, 0)
+        self._files[key] = size
+        self.evict()
+        return file
+
+    def evict(self) -> None:
+        # the newest entry is kept so a just committed file is never removed
+        while self.size > self.max_size and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            (self.path / key).unlink(missing_ok=True)
+            self.size -= size
+            self.evictions += 1
+
+
+class PostCache(AsyncInitializingComponent):
+    def __init__(self):
+        self.memory: LRUCache[FanboxPost] = LRUCache(env_config.POST_CACHE_SIZE)
+        self.store: Optional[SQLiteStore] = None
+        if env_config.POST_CACHE_PATH:
+            self.store = SQLiteStore(env_config.POST_CACHE_PATH)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    @staticmethod
+    def get_ttl(post: FanboxPost) -> int:
+        return get_ttl(post.feeRequired)
+
+    def peek(self, post_id: str) -> Optional[CacheEntry[FanboxPost]]:
+        entry = self.memory.get(post_id)
+        if entry is not None or self.store is None:
+            return entry
+        raw = self.store.get(post_id)
+        if raw is None:
+            return None
+        try:
+            post = FanboxPost.model_validate_json(raw.value)
+        except ValueError:
+            logger.warning("Drop broken cache entry for post %s", post_id)
+            self.store.delete(post_id)
+            return None
+        self.disk_hits += 1
+        entry = CacheEntry(post, raw.stored_at, raw.expires_at)
+        self.memory.set(post_id, entry)
+        return entry
+
+    def lookup(
+        self, post_id: str, max_stale: int = 0
+    ) -> Optional[CacheEntry[FanboxPost]]:
+        """Return the entry if it is fresh or expired less than max_stale ago."""
+        entry = self.peek(post_id)
+        now = time.time()
+        if entry is None or entry.expires_at + max_stale <= now:
+            self.misses += 1
+            return None
+        if entry.is_fresh(now):
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    def get(self, post_id: str) -> Optional[FanboxPost]:
+        entry = self.lookup(post_id)
+        return None if entry is None else entry.value
+
+    def set(
+        self, post: FanboxPost, key: Optional[str] = None, ttl: Optional[int] = None
+    ) -> None:
+        key = key or post.id
+        now = time.time()
+        entry = CacheEntry(post, now, now + (ttl or self.get_ttl(post)))
+        self.memory.set(key, entry)
+        if self.store is not None:
+            self.store.set(
+                key,
+                CacheEntry(
+                    post.model_dump_json().encode(), entry.stored_at, entry.expires_at
+                ),
+            )
+
+    def delete(self, post_id: str) -> None:
+        self.memory.delete(post_id)
+        if self.store is not None:
+            self.store.delete(post_id)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.memory),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.memory.evictions,
+        }
+
+    async def initialize(self):
+        if self.store is not None:
+            pruned = self.store.prune(time.time())
+            if pruned:
+                logger.info("Pruned %s expired posts from cache store", pruned)
+
+    async def shutdown(self):
+        if self.store is not None:
+            self.store.close()
+
+
+class PageCache(AsyncInitializingComponent):
+    """Rendered responses (article html, post json) keyed by kind and post_id."""
+
+    def __init__(self):
+        self.memory: LRUCache[RenderedPage] = LRUCache(env_config.PAGE_CACHE_SIZE)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[RenderedPage]:
+        entry = self.memory.get(key)
+        if entry is None or not entry.is_fresh(time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, page: RenderedPage, ttl: Optional[int] = None) -> None:
+        expires_at = page.last_modified + (ttl or get_ttl(page.fee_required))
+        self.memory.set(key, CacheEntry(page, page.last_modified, expires_at))
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        self.memory.delete_prefix(prefix)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+        }
@@ -0,0 +1,114 @@
+import gzip
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from src.env import env_config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__all__ = (
+    "COMPRESSORS",
+    "StreamCompressor",
+    "compress",
+    "get_encodings",
+    "choose_encoding",
+    "is_compressible",
+)
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return COMPRESSORS[encoding](body)
+
+
+class StreamCompressor:
+    """Incremental compressor, every chunk is flushed so it reaches the client
+    as soon as it is produced."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=5)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def get_encodings() -> List[str]:
+    """Enabled encodings in server preference order, unavailable ones skipped."""
+    return [
+        i
+        for i in (i.strip() for i in env_config.COMPRESSION_ENCODINGS.split(","))
+        if i in COMPRESSORS
+    ]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str], size: Optional[int] = None) -> Optional[str]:
+    """Pick the preferred enabled encoding the client accepts, bodies smaller
+    than COMPRESSION_MIN_SIZE are never compressed."""
+    if not header:
+        return None
+    if size is not None and size < env_config.COMPRESSION_MIN_SIZE:
+        return None
+    accepted = parse_accept_encoding(header)
+    default = accepted.get("*", 0.0)
+    for encoding in get_encodings():
+        if accepted.get(encoding, default) > 0:
+            return encoding
+    return None
@@ -1,7 +1,17 @@
+from typing import Dict, List, Optional
+
 from persica.factory.component import AsyncInitializingComponent
 
+from src.api.breaker import UpstreamGuard
 from src.api.httpxrequest import HTTPXRequest
-from src.api.models import FanboxUser, FanboxPost
+from src.api.models import (
+    FanboxUser,
+    FanboxPost,
+    FanboxPostResponse,
+    FanboxUserResponse,
+)
+from src.env import env_config
+from src.metrics import timer
 
 
 class FanBoxApi(AsyncInitializingComponent):
@@ -24,30 +34,65 @@ class FanBoxApi(AsyncInitializingComponent):
     }
     FANBOX_USER_API = "https://api.fanbox.cc/creator.get"
     FANBOX_POST_API = "https://api.fanbox.cc/post.info"
+    FANBOX_POST_LIST_API = "https://api.fanbox.cc/post.listCreator"
 
     def __init__(self, httpx_request: HTTPXRequest):
         self.request = httpx_request
+        self.guard = UpstreamGuard("api.fanbox.cc", env_config.FANBOX_RATE_LIMIT)
+        self.user_ids: Dict[str, str] = {}
+
+    def get_user_id(self, creator_id: Optional[str]) -> Optional[str]:
+        if not creator_id:
+            return None
+        return self.user_ids.get(creator_id.lower())
+
+    def remember_user_id(self, creator_id: str, user_id: str) -> None:
+        self.user_ids[creator_id.lower()] = user_id
 
     async def get_fanbox_user(self, username: str) -> FanboxUser:
         params = {
             "creatorId": username,
         }
-        req = await self.request.client.get(
+        req = await self.guard.get(
+            self.request,
             self.FANBOX_USER_API,
             params=params,
             headers=self.FANBOX_HEADERS,
         )
         assert req.status_code == 200
-        return FanboxUser(**(req.json()["body"]))
+        user = FanboxUserResponse.model_validate_json(req.content).body
+        self.remember_user_id(user.creatorId, user.user.userId)
+        return user
 
     async def get_fanbox_post(self, post_id: str) -> FanboxPost:
         params = {
             "postId": post_id,
         }
-        req = await self.request.client.get(
-            self.FANBOX_POST_API,
+        with timer("fanbox_post"):
+            req = await self.guard.get(
+                self.request,
+                self.FANBOX_POST_API,
+                params=params,
+                headers=self.FANBOX_HEADERS,
+            )
+            assert req.status_code == 200
+            post = FanboxPostResponse.model_validate_json(req.content).body
+        self.remember_user_id(post.creatorId, post.user.userId)
+        return post
+
+    async def get_creator_post_ids(self, creator_id: str, limit: int = 10) -> List[str]:
+        params = {
+            "creatorId": creator_id,
+            "limit": limit,
+        }
+        req = await self.guard.get(
+            self.request,
+            self.FANBOX_POST_LIST_API,
             params=params,
             headers=self.FANBOX_HEADERS,
         )
         assert req.status_code == 200
-        return FanboxPost(**(req.json()["body"]))
+        body = req.json()["body"]
+        # older responses wrap the list as {"items": [...], "nextUrl": ...}
+        items = body["items"] if isinstance(body, dict) else body
+        return [str(item["id"]) for item in items[:limit]]
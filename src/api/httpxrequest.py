@@ -1,9 +1,24 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from importlib.util import find_spec
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
 import httpx
 
-__all__ = ("HTTPXRequest",)
+__all__ = ("HTTPXRequest", "RetryBudget", "LatencyTracker", "deadline")
 
 from persica.factory.component import AsyncInitializingComponent
 
+from src.env import env_config
+from src.error import APIHelperTimedOut
+from src.log import logger
+from src.metrics import UPSTREAM_LATENCY
+
 timeout_int = 20
 timeout = httpx.Timeout(
     timeout=timeout_int,
@@ -13,12 +28,237 @@ timeout = httpx.Timeout(
     pool=timeout_int,
 )
 
+request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound every upstream call made in this context by a shared deadline."""
+    current = request_deadline.get()
+    new = time.monotonic() + seconds
+    token = request_deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+def get_remaining() -> Optional[float]:
+    current = request_deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+class RetryBudget:
+    """Token bucket shared by all upstreams, each request earns `ratio` retries."""
+
+    def __init__(self, ratio: float, max_tokens: int):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(max_tokens)
+
+    def deposit(self) -> None:
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
 
 class HTTPXRequest(AsyncInitializingComponent):
+    """Per-process pooled httpx clients.
+
+    Upstream hosts listed in POOL_HOSTS get their own connection pool, every
+    other host shares the default one. Clients are bound to the event loop that
+    created them and are rebuilt when the running loop changes.
+    """
+
+    POOL_HOSTS = ("api.fanbox.cc", "kemono.su", "img.kemono.su")
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
     def __init__(self, *args, headers=None, **kwargs):
-        self.client = httpx.AsyncClient(headers=headers, *args, **kwargs)
+        self._args = args
+        self._kwargs = kwargs
+        self._kwargs["headers"] = headers
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.retry_budget = RetryBudget(
+            env_config.HTTP_RETRY_BUDGET_RATIO, env_config.HTTP_RETRY_BUDGET_MAX
+        )
+        self.latency: Dict[str, LatencyTracker] = {}
 
-    async def shutdown(self):
-        if self.client.is_closed:
+    @staticmethod
+    def get_limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=env_config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=env_config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=env_config.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @staticmethod
+    def get_http2() -> bool:
+        if env_config.HTTP2 and find_spec("h2") is None:
+            logger.warning("HTTP2 is enabled but h2 is not installed, using HTTP/1.1")
+            return False
+        return env_config.HTTP2
+
+    @staticmethod
+    def get_timeout(host: str) -> httpx.Timeout:
+        if host == "api.fanbox.cc":
+            return httpx.Timeout(
+                env_config.FANBOX_TIMEOUT, connect=env_config.FANBOX_CONNECT_TIMEOUT
+            )
+        if host == "kemono.su":
+            return httpx.Timeout(
+                env_config.KEMONO_TIMEOUT, connect=env_config.KEMONO_CONNECT_TIMEOUT
+            )
+        return timeout
+
+    @classmethod
+    def get_host(cls, url: str) -> str:
+        host = urlsplit(url).hostname or ""
+        return host if host in cls.POOL_HOSTS else ""
+
+    def build_client(self, host: str = "") -> httpx.AsyncClient:
+        kwargs = {
+            "timeout": self.get_timeout(host),
+            "limits": self.get_limits(),
+            "http2": self.get_http2(),
+        }
+        kwargs.update(self._kwargs)
+        return httpx.AsyncClient(*self._args, **kwargs)
+
+    def _check_loop(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
             return
-        await self.client.aclose()
+        if self._loop is not loop:
+            if self._loop is not None and self._clients:
+                # connections of another loop can not be reused or closed here
+                logger.info("Event loop changed, rebuild httpx clients")
+                self._clients = {}
+            self._loop = loop
+
+    def get_client(self, url: str = "") -> httpx.AsyncClient:
+        self._check_loop()
+        host = self.get_host(url)
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = self._clients[host] = self.build_client(host)
+        return client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.get_client()
+
+    def get_backoff(self, attempt: int) -> float:
+        backoff = random.uniform(0, env_config.HTTP_RETRY_BACKOFF * 2**attempt)
+        remaining = get_remaining()
+        if remaining is not None:
+            backoff = min(backoff, max(remaining, 0))
+        return backoff
+
+    def can_retry(self, attempt: int) -> bool:
+        return attempt < env_config.HTTP_RETRIES and self.retry_budget.withdraw()
+
+    async def _hedged_get(
+        self, client: httpx.AsyncClient, url: str, delay: float, **kwargs
+    ) -> httpx.Response:
+        tasks = [asyncio.ensure_future(client.get(url, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.retry_budget.withdraw():
+                tasks.append(asyncio.ensure_future(client.get(url, **kwargs)))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()
+
+    async def _send(self, url: str, **kwargs) -> httpx.Response:
+        host = self.get_host(url)
+        client = self.get_client(url)
+        tracker = self.latency.setdefault(host, LatencyTracker())
+        delay = tracker.percentile(0.95) if env_config.HTTP_HEDGE else None
+        start = time.monotonic()
+        status = "error"
+        try:
+            if delay is None:
+                response = await client.get(url, **kwargs)
+            else:
+                response = await self._hedged_get(client, url, delay, **kwargs)
+            status = str(response.status_code)
+        finally:
+            elapsed = time.monotonic() - start
+            if env_config.METRICS:
+                UPSTREAM_LATENCY.observe(elapsed, urlsplit(url).hostname or "", status)
+        tracker.record(elapsed)
+        return response
+
+    async def _get_with_retry(self, url: str, **kwargs) -> httpx.Response:
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(url, **kwargs)
+            except httpx.TransportError as exc:
+                if not self.can_retry(attempt):
+                    raise
+                logger.info("Retry %s after %r", url, exc)
+            else:
+                if response.status_code not in self.RETRY_STATUS:
+                    return response
+                if not self.can_retry(attempt):
+                    return response
+                logger.info("Retry %s after status %s", url, response.status_code)
+            attempt += 1
+            await asyncio.sleep(self.get_backoff(attempt))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        remaining = get_remaining()
+        if remaining is not None and remaining <= 0:
+            raise APIHelperTimedOut(f"Deadline exceeded before requesting {url}")
+        try:
+            async with asyncio.timeout(remaining):
+                return await self._get_with_retry(url, **kwargs)
+        except TimeoutError as exc:
+            raise APIHelperTimedOut(f"Deadline exceeded requesting {url}") from exc
+
+    async def shutdown(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            if client.is_closed:
+                continue
+            await client.aclose()
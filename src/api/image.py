@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from persica.factory.component import AsyncInitializingComponent
+
+from src.api.cache import FileCache
+from src.api.httpxrequest import HTTPXRequest
+from src.env import env_config
+from src.error import APIHelperException
+from src.log import logger
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+__all__ = ("IMAGE_HOSTS", "ImageProxy", "ProxiedImage", "get_image_url")
+
+IMAGE_HOSTS = (
+    "downloads.fanbox.cc",
+    "pixiv.pximg.net",
+    "img.kemono.su",
+    "kemono.su",
+)
+
+
+def get_image_url(url: Optional[str]) -> Optional[str]:
+    """Rewrite an upstream image url to the /img proxy when it is enabled."""
+    if not url or not env_config.IMAGE_PROXY:
+        return url
+    parts = urlsplit(url)
+    if parts.hostname not in IMAGE_HOSTS:
+        return url
+    return f"{env_config.IMAGE_PROXY_URL}/img/{parts.hostname}{parts.path}"
+
+
+class ProxiedImage:
+    """Either a cached file or an upstream body that is still streaming."""
+
+    def __init__(
+        self,
+        media_type: str,
+        path: Optional[Path] = None,
+        stream: Optional[AsyncIterator[bytes]] = None,
+    ):
+        self.media_type = media_type
+        self.path = path
+        self.stream = stream
+
+
+class ImageProxy(AsyncInitializingComponent):
+    HEADERS = {"referer": "https://www.fanbox.cc/"}
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, httpx_request: HTTPXRequest):
+        self.request = httpx_request
+        self.cache: Optional[FileCache] = None
+        if env_config.IMAGE_PROXY and env_config.IMAGE_CACHE_PATH:
+            self.cache = FileCache(
+                env_config.IMAGE_CACHE_PATH, env_config.IMAGE_CACHE_SIZE
+            )
+        if env_config.IMAGE_PREVIEW_WIDTH and Image is None:
+            logger.warning("IMAGE_PREVIEW_WIDTH is set but Pillow is not installed")
+
+    @staticmethod
+    def get_preview_width() -> int:
+        """Downscaling needs Pillow and the disk cache, the resized file is
+        what gets served."""
+        if Image is None:
+            return 0
+        return env_config.IMAGE_PREVIEW_WIDTH
+
+    @staticmethod
+    def get_key(url: str, width: int) -> str:
+        digest = hashlib.blake2b(f"{url}#{width}".encode(), digest_size=16)
+        return digest.hexdigest() + Path(urlsplit(url).path).suffix.lower()
+
+    @staticmethod
+    def resize(source: Path, target: Path, width: int) -> None:
+        with Image.open(source) as image:
+            if image.width > width:
+                image.thumbnail((width, image.height * width // image.width))
+            image.save(target, format=image.format)
+
+    async def open(self, url: str) -> httpx.Response:
+        client = self.request.get_client(url)
+        request = client.build_request("GET", url, headers=self.HEADERS)
+        response = await client.send(request, stream=True)
+        if response.status_code != 200:
+            await response.aclose()
+            raise APIHelperException(f"Image {url} returned {response.status_code}")
+        return response
+
+    async def iter_response(
+        self, response: httpx.Response, key: Optional[str]
+    ) -> AsyncIterator[bytes]:
+        """Stream the upstream body, teeing it into the disk cache."""
+        temp_path = file = None
+        if key is not None:
+            temp_path = self.cache.get_temp_path()
+            file = temp_path.open("wb")
+        try:
+            async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                if file is not None:
+                    file.write(chunk)
+                yield chunk
+            if file is not None:
+                file.close()
+                self.cache.commit(key, temp_path)
+                temp_path = None
+        finally:
+            await response.aclose()
+            if file is not None:
+                file.close()
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+    async def download(self, response: httpx.Response, key: str, width: int) -> Path:
+        temp_path = self.cache.get_temp_path()
+        resized_path = self.cache.get_temp_path()
+        try:
+            with temp_path.open("wb") as file:
+                async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                    file.write(chunk)
+            await asyncio.to_thread(self.resize, temp_path, resized_path, width)
+            return self.cache.commit(key, resized_path)
+        finally:
+            await response.aclose()
+            temp_path.unlink(missing_ok=True)
+            resized_path.unlink(missing_ok=True)
+
+    def is_cacheable(self, response: httpx.Response) -> bool:
+        size = response.headers.get("content-length")
+        return size is None or int(size) <= self.cache.max_size
+
+    async def get_image(self, host: str, path: str) -> ProxiedImage:
+        if host not in IMAGE_HOSTS:
+            raise APIHelperException(f"Image host {host} is not allowed")
+        url = f"https://{host}/{path}"
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if self.cache is None:
+            return ProxiedImage(
+                media_type, stream=self.iter_response(await self.open(url), None)
+            )
+        width = self.get_preview_width()
+        key = self.get_key(url, width)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return ProxiedImage(media_type, path=cached)
+        response = await self.open(url)
+        if not self.is_cacheable(response):
+            return ProxiedImage(media_type, stream=self.iter_response(response, None))
+        if width:
+            return ProxiedImage(
+                media_type, path=await self.download(response, key, width)
+            )
+        return ProxiedImage(media_type, stream=self.iter_response(response, key))
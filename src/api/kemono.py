@@ -1,8 +1,11 @@
+import asyncio
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+import httpx
 from persica.factory.component import AsyncInitializingComponent
 
+from src.api.breaker import UpstreamGuard
 from src.api.httpxrequest import HTTPXRequest
 from src.api.models import (
     KemonoPost,
@@ -13,18 +16,32 @@ from src.api.models import (
     FanboxPostBodyImage,
     KemonoPostPreview,
 )
+from src.env import env_config
+from src.error import APIHelperException
 from src.log import logger
+from src.metrics import timer
+
+
+IMG_PATTERN = re.compile(r'<img\s+[^>]*src=(["\'])(.*?)\1[^>]*>', re.IGNORECASE)
+# kemono serves lowercase tags, matching case-sensitively keeps the literal "<"
+# prefix scan fast. Tags that end a paragraph split the content in one pass.
+BREAK_PATTERN = re.compile(r"</?(?:p|div|li|ul|ol|blockquote|br)\b[^>]*>")
+# tags that produce their own blocks inside a paragraph
+BLOCK_PATTERN = re.compile(r"<(/?)(h[1-6]|img)\b([^>]*)>")
+SRC_PATTERN = re.compile(r"""\ssrc=(["'])(.*?)\1""", re.IGNORECASE)
 
 
 class KemonoApi(AsyncInitializingComponent):
     def __init__(self, httpx_request: HTTPXRequest):
         self.request = httpx_request
+        self.guard = UpstreamGuard("kemono.su", env_config.KEMONO_RATE_LIMIT)
 
     async def get_kemono_user_post(self, user: str, post: str) -> KemonoPost:
         route = f"https://kemono.su/api/v1/fanbox/user/{user}/post/{post}"
-        req = await self.request.client.get(route)
-        assert req.status_code == 200
-        return KemonoPost(**req.json())
+        with timer("kemono_post"):
+            req = await self.guard.get(self.request, route)
+            assert req.status_code == 200
+            return KemonoPost.model_validate_json(req.content)
 
     @staticmethod
     def extract_img_src_and_clean_p(p_content: str):
@@ -39,15 +56,14 @@ class KemonoApi(AsyncInitializingComponent):
                 img_src_list: 所有 img 标签的 src 属性列表
                 cleaned_p_content: 去除 img 标签后的 p 标签 HTML 字符串
         """
-        # 正则表达式匹配 img 标签及其 src 属性
-        img_pattern = re.compile(r'<img\s+[^>]*src=(["\'])(.*?)\1[^>]*>', re.IGNORECASE)
+        img_src_list = []
 
-        # 查找所有匹配的 img 标签并提取 src
-        img_matches = img_pattern.finditer(p_content)
-        img_src_list = [match.group(2) for match in img_matches]
+        def remove_img(match: "re.Match") -> str:
+            img_src_list.append(match.group(2))
+            return ""
 
-        # 移除所有 img 标签
-        cleaned_p = img_pattern.sub("", p_content)
+        # 一次 sub 同时提取 src 并移除 img 标签
+        cleaned_p = IMG_PATTERN.sub(remove_img, p_content)
 
         return img_src_list, cleaned_p
 
@@ -66,34 +82,89 @@ class KemonoApi(AsyncInitializingComponent):
             id=preview.name, thumbnailUrl=preview.url
         )
 
+    @staticmethod
+    def parse_kemono_content(
+        content: str,
+        blocks: List["FanboxPostBodyBlock"],
+        image_maps: Dict[str, "FanboxPostBodyImage"],
+    ) -> None:
+        """
+        单次扫描 kemono 的 HTML 内容并按文档顺序生成 blocks
+
+        p/br/div 等标签与换行会结束当前段落，h1-h6 生成 header，img 生成图片，
+        其余行内标签原样保留在段落文本中，空段落会被合并丢弃。
+        """
+        block_type = FanboxPostBodyBlockType.P
+
+        def add_text(text: str) -> None:
+            text = text.strip()
+            if text:
+                blocks.append(FanboxPostBodyBlock(type=block_type, text=text))
+
+        # 换行与 br 等价，先替换再整体切分一次
+        for piece in BREAK_PATTERN.split(content.replace("\n", "<br>")):
+            if "<" not in piece:
+                add_text(piece)
+                continue
+            position = 0
+            for match in BLOCK_PATTERN.finditer(piece):
+                add_text(piece[position : match.start()])
+                position = match.end()
+                if match.group(2) != "img":
+                    block_type = (
+                        FanboxPostBodyBlockType.P
+                        if match.group(1)
+                        else FanboxPostBodyBlockType.HEADER
+                    )
+                    continue
+                src = SRC_PATTERN.search(match.group(3))
+                if src is not None:
+                    KemonoApi.parse_kemono_post_preview(
+                        KemonoPostPreview.from_src(src.group(2)), blocks, image_maps
+                    )
+            add_text(piece[position:])
+
     @staticmethod
     def parse_kemono_post(post: KemonoPost) -> FanboxPostBody:
         blocks = []
         image_maps = {}
         if post.post.content:
-            for p in post.post.content.split("\n"):
-                img_src_list, cleaned_p = KemonoApi.extract_img_src_and_clean_p(p)
-                blocks.append(
-                    FanboxPostBodyBlock(type=FanboxPostBodyBlockType.P, text=cleaned_p)
-                )
-                for img_src in img_src_list:
-                    KemonoApi.parse_kemono_post_preview(
-                        KemonoPostPreview.from_src(img_src), blocks, image_maps
-                    )
+            KemonoApi.parse_kemono_content(post.post.content, blocks, image_maps)
         if post.previews:
             for preview in post.previews:
                 KemonoApi.parse_kemono_post_preview(preview, blocks, image_maps)
         return FanboxPostBody(blocks=blocks, imageMap=image_maps)
 
-    async def patch_post_info(self, post: FanboxPost) -> FanboxPost:
+    @staticmethod
+    def discard_task(task: "asyncio.Task") -> None:
+        task.cancel()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def patch_post_info(
+        self, post: FanboxPost, prefetch: Optional["asyncio.Task[KemonoPost]"] = None
+    ) -> FanboxPost:
+        """Replace the body of a paid post with its kemono mirror.
+
+        prefetch is an already started get_kemono_user_post task for this post,
+        it is discarded when the post turns out to be free.
+        """
         if not post.feeRequired:
+            if prefetch is not None:
+                self.discard_task(prefetch)
             return post
         user = post.user.userId
         try:
-            kemono_post = await self.get_kemono_user_post(user, post.id)
+            if prefetch is not None:
+                kemono_post = await prefetch
+            else:
+                kemono_post = await self.get_kemono_user_post(user, post.id)
         except AssertionError:
             logger.warning(f"Kemono post not found for {user}/{post.id}")
             return post
-        post.body = self.parse_kemono_post(kemono_post)
+        except (APIHelperException, httpx.HTTPError) as exc:
+            logger.warning(f"Kemono post unavailable for {user}/{post.id}: {exc!r}")
+            return post
+        with timer("parse_kemono_post"):
+            post.body = self.parse_kemono_post(kemono_post)
         logger.info(f"Patched post info for {user}/{post.id}")
         return post
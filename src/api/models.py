@@ -2,7 +2,7 @@ import datetime
 import enum
 from typing import Optional, List, Any, Dict
 
-from pydantic import BaseModel, model_validator
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class FanboxLiteUser(BaseModel):
@@ -52,27 +52,19 @@ class FanboxPostBodyBlockType(str, enum.Enum):
     HEADER = "header"
     UNKNOWN = "unknown"
 
+    @classmethod
+    def _missing_(cls, value: Any) -> "FanboxPostBodyBlockType":
+        return cls.UNKNOWN
+
 
 class FanboxPostBodyBlock(BaseModel):
     type: FanboxPostBodyBlockType = FanboxPostBodyBlockType.UNKNOWN
-    raw_type: str = ""
+    # the untouched upstream type, unknown types map to UNKNOWN via _missing_
+    # so both fields are validated by pydantic-core without a python hook
+    raw_type: str = Field("", validation_alias=AliasChoices("raw_type", "type"))
     text: Optional[str] = None
     imageId: Optional[str] = None
 
-    @model_validator(mode="before")
-    @classmethod
-    def before(cls, values: Any) -> Any:
-        old_type = values.get("type")
-        if isinstance(old_type, FanboxPostBodyBlockType):
-            values["raw_type"] = old_type.value
-        else:
-            values["raw_type"] = old_type
-            try:
-                values["type"] = FanboxPostBodyBlockType(values["raw_type"])
-            except ValueError:
-                values["type"] = FanboxPostBodyBlockType.UNKNOWN
-        return values
-
 
 class FanboxPostBodyImage(BaseModel):
     id: str
@@ -118,6 +110,14 @@ class FanboxPost(FanboxLitePost):
         return f"❤️ {self.likeCount}・{self.feeRequired} 日元"
 
 
+class FanboxUserResponse(BaseModel):
+    body: FanboxUser
+
+
+class FanboxPostResponse(BaseModel):
+    body: FanboxPost
+
+
 class KemonoPostInfo(BaseModel):
     id: str
     user: str
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Set
+
+from persica.factory.component import AsyncInitializingComponent
+
+from src.api.refresh import TaskQueue
+from src.api.render import RenderArticle
+from src.env import env_config
+from src.log import logger
+
+__all__ = ("Prefetcher", "parse_warm_up_items")
+
+
+def parse_warm_up_items(value: str) -> List[str]:
+    """Post ids and @creatorId entries separated by commas or whitespace."""
+    return [i for i in value.replace(",", " ").split() if i]
+
+
+class Prefetcher(AsyncInitializingComponent):
+    """Warm the post cache with posts that are likely to be shared next.
+
+    After a post is served its nextPost/prevPost neighbours are queued, and,
+    once per creator per PREFETCH_CREATOR_INTERVAL, the creator's recent posts.
+    """
+
+    MAX_CREATORS = 1024
+
+    def __init__(self, render: RenderArticle):
+        self.render = render
+        self.queue = TaskQueue(
+            env_config.PREFETCH_QUEUE_SIZE, env_config.PREFETCH_CONCURRENCY, "Prefetch"
+        )
+        self.creators: "OrderedDict[str, float]" = OrderedDict()
+        self.warm_up_tasks: Set[asyncio.Task] = set()
+
+    def is_cached(self, post_id: str) -> bool:
+        entry = self.render.post_cache.peek(post_id)
+        return entry is not None and entry.is_fresh(time.time())
+
+    def schedule_post(self, post_id: str, creator_id: Optional[str] = None) -> bool:
+        if self.is_cached(post_id):
+            return False
+        return self.queue.schedule(
+            post_id, partial(self.render.refresh_post_info, post_id, creator_id)
+        )
+
+    def prefetch(self, post_id: str) -> None:
+        """Queue the neighbours of a post that was just served."""
+        if not env_config.PREFETCH:
+            return
+        entry = self.render.post_cache.peek(post_id)
+        if entry is None:
+            return
+        post = entry.value
+        for neighbour in (post.nextPost, post.prevPost):
+            if neighbour is not None:
+                self.schedule_post(neighbour.id, post.creatorId)
+        if env_config.PREFETCH_CREATOR_POSTS:
+            self.prefetch_creator(post.creatorId)
+
+    def prefetch_creator(self, creator_id: str) -> bool:
+        now = time.monotonic()
+        last = self.creators.get(creator_id)
+        if last is not None and now - last < env_config.PREFETCH_CREATOR_INTERVAL:
+            return False
+        self.creators[creator_id] = now
+        self.creators.move_to_end(creator_id)
+        while len(self.creators) > self.MAX_CREATORS:
+            self.creators.popitem(last=False)
+        return self.queue.schedule(
+            f"@{creator_id}", partial(self.load_creator, creator_id)
+        )
+
+    async def load_creator(self, creator_id: str) -> None:
+        fanbox_api = self.render.fanbox_api
+        if fanbox_api.get_user_id(creator_id) is None:
+            # creator.get learns the userId so kemono can be fetched speculatively
+            await fanbox_api.get_fanbox_user(creator_id)
+        if not env_config.PREFETCH_CREATOR_POSTS:
+            return
+        post_ids = await fanbox_api.get_creator_post_ids(
+            creator_id, env_config.PREFETCH_CREATOR_POSTS
+        )
+        for post_id in post_ids:
+            self.schedule_post(post_id, creator_id)
+
+    async def warm_up(self, items: List[str]) -> int:
+        """Load every post id (or @creatorId) into the cache, returns how many
+        were loaded successfully."""
+        semaphore = asyncio.Semaphore(env_config.PREFETCH_CONCURRENCY)
+
+        async def load(item: str) -> bool:
+            async with semaphore:
+                try:
+                    if item.startswith("@"):
+                        await self.load_creator(item[1:])
+                    elif not self.is_cached(item):
+                        await self.render.refresh_post_info(item)
+                except Exception as exc:
+                    logger.warning("Warm up %s failed: %r", item, exc)
+                    return False
+                return True
+
+        results = await asyncio.gather(*[load(i) for i in dict.fromkeys(items)])
+        loaded = sum(results)
+        logger.info("Warmed up %s of %s cache entries", loaded, len(results))
+        return loaded
+
+    def schedule_warm_up(self, items: List[str]) -> None:
+        task = asyncio.create_task(self.warm_up(items))
+        self.warm_up_tasks.add(task)
+        task.add_done_callback(self.warm_up_tasks.discard)
+
+    async def initialize(self):
+        # PREFETCH_WARM_UP is either the list itself or a file listing it
+        value = env_config.PREFETCH_WARM_UP
+        if value and Path(value).is_file():
+            value = Path(value).read_text(encoding="utf-8")
+        items = parse_warm_up_items(value)
+        if items:
+            self.schedule_warm_up(items)
+
+    async def shutdown(self):
+        tasks = list(self.warm_up_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.queue.shutdown()
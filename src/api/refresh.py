@@ -0,0 +1,66 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+from persica.factory.component import AsyncInitializingComponent
+
+from src.env import env_config
+from src.log import logger
+
+__all__ = ("TaskQueue", "RefreshQueue")
+
+
+class TaskQueue:
+    """Bounded set of keyed background tasks with a concurrency cap, a key
+    that is already queued is not scheduled twice."""
+
+    def __init__(self, max_size: int, concurrency: int, name: str = "Background task"):
+        self.max_size = max_size
+        self.concurrency = concurrency
+        self.name = name
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.dropped = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def schedule(self, key: str, func: Callable[[], Awaitable]) -> bool:
+        if key in self.tasks:
+            return True
+        if len(self.tasks) >= self.max_size:
+            self.dropped += 1
+            return False
+        task = asyncio.create_task(self._run(key, func))
+        self.tasks[key] = task
+        task.add_done_callback(lambda _: self.tasks.pop(key, None))
+        return True
+
+    async def _run(self, key: str, func: Callable[[], Awaitable]) -> None:
+        async with self.semaphore:
+            try:
+                await func()
+            except Exception as exc:
+                logger.warning("%s %s failed: %r", self.name, key, exc)
+
+    async def shutdown(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class RefreshQueue(TaskQueue, AsyncInitializingComponent):
+    """Stale-while-revalidate refreshes of cached posts."""
+
+    def __init__(self):
+        super().__init__(
+            env_config.REFRESH_QUEUE_SIZE,
+            env_config.REFRESH_CONCURRENCY,
+            "Background refresh",
+        )
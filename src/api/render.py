@@ -1,60 +1,301 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
 from persica.factory.component import AsyncInitializingComponent
 
 from src import template_env
+from src.api.cache import PageCache, PostCache, RenderedPage
 from src.api.fanbox import FanBoxApi
+from src.api.httpxrequest import deadline
+from src.api.image import get_image_url
 from src.api.kemono import KemonoApi
 from src.api.models import FanboxPost, FanboxPostBodyBlockType
+from src.api.refresh import RefreshQueue
+from src.api.singleflight import SingleFlight
+from src.env import env_config
 from src.error import ArticleNotFoundError
+from src.log import logger
+from src.metrics import timer
 
 
 class RenderArticle(AsyncInitializingComponent):
-    def __init__(self, fanbox_api: FanBoxApi, kemono_api: KemonoApi):
+    def __init__(
+        self,
+        fanbox_api: FanBoxApi,
+        kemono_api: KemonoApi,
+        post_cache: PostCache,
+        page_cache: PageCache,
+        refresh_queue: RefreshQueue,
+    ):
         self.fanbox_api = fanbox_api
         self.kemono_api = kemono_api
+        self.post_cache = post_cache
+        self.page_cache = page_cache
+        self.refresh_queue = refresh_queue
         self.template = template_env.get_template("article.jinja2")
+        self.post_flight: SingleFlight[FanboxPost] = SingleFlight()
+        self.page_flight: SingleFlight[RenderedPage] = SingleFlight()
+
+    async def fetch_post_info(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> "FanboxPost":
+        with deadline(env_config.UPSTREAM_DEADLINE):
+            prefetch = None
+            user_id = self.fanbox_api.get_user_id(creator_id)
+            if (
+                user_id
+                and env_config.KEMONO_SPECULATIVE
+                and not self.kemono_api.guard.is_open
+            ):
+                prefetch = asyncio.create_task(
+                    self.kemono_api.get_kemono_user_post(user_id, post_id)
+                )
+            try:
+                post = await self.fanbox_api.get_fanbox_post(post_id)
+                if post.user.userId != user_id:
+                    # creatorId hint did not match this post, drop the guess
+                    return await self.kemono_api.patch_post_info(post)
+                return await self.kemono_api.patch_post_info(post, prefetch)
+            except AssertionError:
+                raise ArticleNotFoundError(post_id)
+            finally:
+                if prefetch is not None:
+                    self.kemono_api.discard_task(prefetch)
+
+    async def load_post_info(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> "FanboxPost":
+        post = await self.fetch_post_info(post_id, creator_id)
+        self.post_cache.set(post)
+        self.page_cache.delete(f"html:{post_id}")
+        self.page_cache.delete(f"json:{post_id}")
+        self.page_cache.delete_prefix(f"json:{post_id}:")
+        return post
+
+    async def refresh_post_info(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> "FanboxPost":
+        return await self.post_flight.do(
+            post_id, partial(self.load_post_info, post_id, creator_id)
+        )
 
-    async def get_post_info(self, post_id: str):
+    async def get_post_info(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> "FanboxPost":
+        swr = env_config.CACHE_STALE_WHILE_REVALIDATE
+        entry = self.post_cache.lookup(
+            post_id, env_config.CACHE_MAX_STALE if swr else 0
+        )
+        if entry is not None:
+            if not entry.is_fresh(time.time()):
+                self.refresh_queue.schedule(
+                    post_id, partial(self.refresh_post_info, post_id, creator_id)
+                )
+            return entry.value
         try:
-            post = await self.fanbox_api.get_fanbox_post(post_id)
-            return await self.kemono_api.patch_post_info(post)
-        except AssertionError:
-            raise ArticleNotFoundError(post_id)
+            return await self.refresh_post_info(post_id, creator_id)
+        except Exception as exc:
+            entry = self.post_cache.peek(post_id) if swr else None
+            if entry is None:
+                raise
+            logger.warning("Serve stale post %s after upstream error: %r", post_id, exc)
+            return entry.value
 
     @staticmethod
-    def parse_content(post_info: "FanboxPost") -> str:
-        text = ""
+    def iter_content(post_info: "FanboxPost") -> Iterator[str]:
         data = post_info.body
         if not data:
-            return text
+            return
         if data.images:
             for img in data.images:
-                text += f'<img src="{img.thumbnailUrl}"/><br/>\n'
+                yield f'<img src="{get_image_url(img.thumbnailUrl)}"/><br/>\n'
         if data.blocks:
             for item in data.blocks:
                 if item.type is FanboxPostBodyBlockType.P:
-                    text += f"<p>{item.text}</p><br/>\n"
+                    yield f"<p>{item.text}</p><br/>\n"
                 elif item.type is FanboxPostBodyBlockType.IMAGE:
-                    text += f'<img src="{data.imageMap[item.imageId].thumbnailUrl}"/><br/>\n'
+                    url = get_image_url(data.imageMap[item.imageId].thumbnailUrl)
+                    yield f'<img src="{url}"/><br/>\n'
                 elif item.type is FanboxPostBodyBlockType.HEADER:
-                    text += f"<h2>{item.text}</h2><br/>\n"
+                    yield f"<h2>{item.text}</h2><br/>\n"
         elif data.text:
-            text += f"<p>{data.text}</p><br/>\n"
-        return text
+            yield f"<p>{data.text}</p><br/>\n"
 
-    async def process_article_text(self, post_info: "FanboxPost") -> str:
-        data = {
+    @classmethod
+    def parse_content(cls, post_info: "FanboxPost") -> str:
+        return "".join(cls.iter_content(post_info))
+
+    def get_template_data(
+        self, post_info: "FanboxPost", stream: bool = False
+    ) -> Dict[str, Any]:
+        # the template iterates article, streaming feeds it fragment by fragment
+        content = self.iter_content(post_info)
+        if not stream:
+            with timer("parse_content"):
+                content = ("".join(content),)
+        return {
             "published_time": post_info.create_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "channel": "shota_audio",
             "post": post_info,
             "author": post_info.user,
+            "description": post_info.excerpt.strip(),
+            "image_for_share": get_image_url(post_info.imageForShare),
+            "icon_url": get_image_url(post_info.user.iconUrl),
+            "article": content,
         }
-        content = self.parse_content(post_info)
-        return self.template.render(
-            description=post_info.excerpt.strip(),
-            article=content,
-            **data,
+
+    async def process_article_text(self, post_info: "FanboxPost") -> str:
+        data = self.get_template_data(post_info)
+        with timer("render"):
+            return self.template.render(**data)
+
+    async def stream_article(self, post_info: "FanboxPost") -> AsyncIterator[bytes]:
+        """Stream the article, the <head> is flushed on its own as soon as it
+        is rendered. The full page is cached once the stream completes."""
+        chunks, buffer, size, head_sent = [], [], 0, False
+        for fragment in self.template.generate(
+            **self.get_template_data(post_info, stream=True)
+        ):
+            buffer.append(fragment)
+            size += len(fragment)
+            if size >= env_config.STREAM_CHUNK_SIZE or (
+                not head_sent and "</head>" in fragment
+            ):
+                head_sent = True
+                chunk = "".join(buffer).encode()
+                chunks.append(chunk)
+                buffer, size = [], 0
+                yield chunk
+        if buffer:
+            chunk = "".join(buffer).encode()
+            chunks.append(chunk)
+            yield chunk
+        page = RenderedPage.from_body(b"".join(chunks), bool(post_info.feeRequired))
+        self.page_cache.set(f"html:{post_info.id}", page)
+
+    async def render_article_page(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> RenderedPage:
+        post_info = await self.get_post_info(post_id, creator_id)
+        text = await self.process_article_text(post_info)
+        page = RenderedPage.from_body(text.encode(), bool(post_info.feeRequired))
+        self.page_cache.set(f"html:{post_id}", page)
+        return page
+
+    async def load_preview_post(self, post_id: str) -> "FanboxPost":
+        with deadline(env_config.UPSTREAM_DEADLINE):
+            try:
+                post = await self.fanbox_api.get_fanbox_post(post_id)
+            except AssertionError:
+                raise ArticleNotFoundError(post_id)
+        self.post_cache.set(
+            post, key=f"preview:{post_id}", ttl=env_config.PREVIEW_CACHE_TTL
+        )
+        return post
+
+    async def get_preview_post(self, post_id: str) -> "FanboxPost":
+        """Fanbox data only, the kemono patch is never needed for the head."""
+        entry = self.post_cache.peek(post_id)
+        if entry is not None and entry.is_fresh(time.time()):
+            return entry.value
+        key = f"preview:{post_id}"
+        post = self.post_cache.get(key)
+        if post is not None:
+            return post
+        return await self.post_flight.do(key, partial(self.load_preview_post, post_id))
+
+    async def render_preview_page(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> RenderedPage:
+        post_info = await self.get_preview_post(post_id)
+        # the lazy article generator is never consumed when head_only is set
+        data = self.get_template_data(post_info, stream=True)
+        text = self.template.render(head_only=True, **data)
+        page = RenderedPage.from_body(text.encode(), bool(post_info.feeRequired))
+        self.page_cache.set(f"head:{post_id}", page, env_config.PREVIEW_CACHE_TTL)
+        return page
+
+    @staticmethod
+    def get_json_fields(fields: Optional[str]) -> str:
+        """Normalize a ?fields= projection, unknown top level fields are dropped.
+
+        Nested fields use a dot, e.g. "title,excerpt,body.images".
+        """
+        if not fields:
+            return ""
+        names = {
+            i.strip()
+            for i in fields.split(",")
+            if i.strip().split(".", 1)[0] in FanboxPost.model_fields
+        }
+        return ",".join(sorted(names))
+
+    @staticmethod
+    def get_json_key(post_id: str, fields: str) -> str:
+        return f"json:{post_id}:{fields}" if fields else f"json:{post_id}"
+
+    @staticmethod
+    def get_json_include(fields: str) -> Optional[Dict[str, Any]]:
+        if not fields:
+            return None
+        include: Dict[str, Any] = {}
+        for name in fields.split(","):
+            root, _, child = name.partition(".")
+            if not child:
+                include[root] = True
+            elif include.get(root) is not True:
+                include.setdefault(root, {})[child] = True
+        return include
+
+    async def render_json_page(
+        self, post_id: str, creator_id: Optional[str] = None, fields: str = ""
+    ) -> RenderedPage:
+        post_info = await self.get_post_info(post_id, creator_id)
+        include = self.get_json_include(fields)
+        with timer("json_dump"):
+            body = post_info.model_dump_json(include=include).encode()
+        page = RenderedPage.from_body(body, bool(post_info.feeRequired))
+        self.page_cache.set(self.get_json_key(post_id, fields), page)
+        return page
+
+    async def get_page(
+        self, key: str, post_id: str, creator_id: Optional[str], func
+    ) -> RenderedPage:
+        page = self.page_cache.get(key)
+        if page is not None:
+            return page
+        return await self.page_flight.do(key, partial(func, post_id, creator_id))
+
+    async def get_article_page(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> RenderedPage:
+        return await self.get_page(
+            f"html:{post_id}", post_id, creator_id, self.render_article_page
+        )
+
+    async def get_json_page(
+        self,
+        post_id: str,
+        creator_id: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> RenderedPage:
+        fields = self.get_json_fields(fields)
+        return await self.get_page(
+            self.get_json_key(post_id, fields),
+            post_id,
+            creator_id,
+            partial(self.render_json_page, fields=fields),
+        )
+
+    async def get_preview_page(
+        self, post_id: str, creator_id: Optional[str] = None
+    ) -> RenderedPage:
+        return await self.get_page(
+            f"head:{post_id}", post_id, creator_id, self.render_preview_page
         )
 
     async def process_article(self, post_id: str) -> str:
-        post_info = await self.get_post_info(post_id)
-        return await self.process_article_text(post_info)
+        page = await self.get_article_page(post_id)
+        return page.body.decode()
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+__all__ = ("SingleFlight",)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Deduplicate concurrent calls sharing the same key.
+
+    The first caller starts the work, later callers with the same key await the
+    same task and receive its result or exception. The shared task is cancelled
+    once every waiter has been cancelled.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: str, call: _Call[T], task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            # mark the exception as retrieved, waiters already got it
+            task.exception()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda t: self._forget(key, call, t))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
@@ -0,0 +1,26 @@
+"""Precompile src/templates into python modules loaded by template_env.
+
+python -m src.compile_templates
+
+Run it after editing a template, tests/test_templates.py fails while the
+compiled modules are out of date.
+"""
+
+import shutil
+
+import jinja2
+
+from src import COMPILED_TEMPLATE_PATH, TEMPLATE_PATH
+
+__all__ = ("compile_templates",)
+
+
+def compile_templates(target: str = COMPILED_TEMPLATE_PATH) -> None:
+    # compile from the sources only, template_env would also see the modules
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_PATH))
+    shutil.rmtree(target, ignore_errors=True)
+    env.compile_templates(target, extensions=["jinja2"], zip=None)
+
+
+if __name__ == "__main__":
+    compile_templates()
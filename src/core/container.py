@@ -0,0 +1,64 @@
+import asyncio
+import inspect
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Type, TypeVar, get_type_hints
+
+from persica.factory.component import AsyncInitializingComponent
+
+from src.log import logger
+
+__all__ = ("Container",)
+
+T = TypeVar("T")
+
+
+class Container:
+    """Minimal stand-in for the persica application context.
+
+    Builds the given components and whatever their constructors ask for by
+    type annotation, without importing and scanning every package. Used by
+    the serverless entry point, where scanning is paid on each cold start.
+    """
+
+    def __init__(self, components: Sequence[type]):
+        self.objects: Dict[type, Any] = {}
+        for component in components:
+            self.get(component)
+
+    def get(self, cls: Type[T]) -> T:
+        obj = self.objects.get(cls)
+        if obj is None:
+            hints = get_type_hints(cls.__init__)
+            kwargs = {
+                name: self.get(hints[name])
+                for name, param in inspect.signature(cls.__init__).parameters.items()
+                if name in hints and param.default is inspect.Parameter.empty
+            }
+            obj = self.objects[cls] = cls(**kwargs)
+        return obj
+
+    @staticmethod
+    async def _run_async(component: AsyncInitializingComponent, method_name: str):
+        try:
+            await getattr(component, method_name)()
+        except Exception as e:
+            logger.exception("Run Error", exc_info=e)
+
+    async def _process_components(self, method_name: str):
+        # same ordering as persica: by __order__, concurrently within an order
+        components_by_order: Dict[int, List[AsyncInitializingComponent]] = defaultdict(
+            list
+        )
+        for obj in self.objects.values():
+            if isinstance(obj, AsyncInitializingComponent):
+                components_by_order[obj.__order__].append(obj)
+        for order in sorted(components_by_order.keys()):
+            await asyncio.gather(
+                *[self._run_async(i, method_name) for i in components_by_order[order]]
+            )
+
+    async def initialize(self):
+        await self._process_components("initialize")
+
+    async def shutdown(self):
+        await self._process_components("shutdown")
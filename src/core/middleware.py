@@ -0,0 +1,125 @@
+from typing import TYPE_CHECKING, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.api.compression import (
+    StreamCompressor,
+    choose_encoding,
+    compress,
+    is_compressible,
+)
+from src.metrics import IN_FLIGHT, REQUESTS
+
+if TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+__all__ = ("CompressionMiddleware", "MetricsMiddleware")
+
+
+class CompressionMiddleware:
+    """Negotiate gzip/br/zstd from Accept-Encoding for responses that are not
+    already encoded. Whole bodies below COMPRESSION_MIN_SIZE pass through,
+    streamed bodies are compressed chunk by chunk."""
+
+    def __init__(self, app: "ASGIApp"):
+        self.app = app
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send"):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        if choose_encoding(accept_encoding) is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(send, accept_encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(self, send: "Send", accept_encoding: str):
+        self._send = send
+        self.accept_encoding = accept_encoding
+        self.start: Optional["Message"] = None
+        self.compressor: Optional[StreamCompressor] = None
+
+    def get_encoding(
+        self, start: "Message", headers: "MutableHeaders", size: Optional[int]
+    ) -> Optional[str]:
+        if "content-encoding" in headers or start["status"] in (204, 304):
+            return None
+        if not is_compressible(headers.get("content-type", "")):
+            return None
+        headers.add_vary_header("Accept-Encoding")
+        return choose_encoding(self.accept_encoding, size)
+
+    async def send(self, message: "Message") -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            encoding = self.get_encoding(
+                start, headers, None if more_body else len(body)
+            )
+            if encoding is None:
+                await self._send(start)
+                await self._send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            if not more_body:
+                # the whole body is known, compress it in one go
+                body = compress(body, encoding)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            self.compressor = StreamCompressor(encoding)
+            await self._send(start)
+        elif self.compressor is None:
+            await self._send(message)
+            return
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+
+class MetricsMiddleware:
+    """Count requests by route template and status, track in-flight requests.
+
+    Only installed when METRICS is enabled."""
+
+    def __init__(self, app: "ASGIApp"):
+        self.app = app
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send"):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message: "Message") -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            # the route template keeps the label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUESTS.inc(route, str(status))
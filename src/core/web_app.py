@@ -1,22 +1,28 @@
 import asyncio
 
-import uvicorn
-
 from fastapi import FastAPI
 from persica.factory.component import AsyncInitializingComponent
 
+from src.core.middleware import CompressionMiddleware, MetricsMiddleware
 from src.env import env_config
 
 
 class WebApp(AsyncInitializingComponent):
     def __init__(self):
         self.app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+        if env_config.COMPRESSION_ENCODINGS:
+            self.app.add_middleware(CompressionMiddleware)
+        if env_config.METRICS:
+            self.app.add_middleware(MetricsMiddleware)
         self.web_server = None
         self.web_server_task = None
 
     async def start(self):
         if not env_config.START_WEB:
             return
+        # serverless entry points never start the server, keep it off their cold start
+        import uvicorn
+
         self.web_server = uvicorn.Server(
             config=uvicorn.Config(
                 self.app, host=env_config.LISTEN, port=env_config.PORT
@@ -9,6 +9,67 @@ class EnvConfig(BaseSettings):
     LISTEN: str = "0.0.0.0"
     PORT: int = 8080
     START_WEB: bool = True
+    METRICS: bool = False
+
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30
+    HTTP2: bool = False
+    UPSTREAM_DEADLINE: float = 15
+    FANBOX_TIMEOUT: float = 8
+    FANBOX_CONNECT_TIMEOUT: float = 3
+    KEMONO_TIMEOUT: float = 6
+    KEMONO_CONNECT_TIMEOUT: float = 2
+    HTTP_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 0.2
+    HTTP_RETRY_BUDGET_RATIO: float = 0.1
+    HTTP_RETRY_BUDGET_MAX: int = 20
+    HTTP_HEDGE: bool = False
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30
+    BREAKER_HALF_OPEN_MAX: int = 1
+    FANBOX_RATE_LIMIT: float = 10
+    KEMONO_RATE_LIMIT: float = 5
+    RATE_LIMIT_MIN: float = 0.5
+
+    POST_CACHE_SIZE: int = 512
+    POST_CACHE_TTL: int = 300
+    POST_CACHE_FEE_TTL: int = 1800
+    POST_CACHE_PATH: str = ""
+    CACHE_STALE_WHILE_REVALIDATE: bool = False
+    CACHE_MAX_STALE: int = 86400
+    REFRESH_QUEUE_SIZE: int = 64
+    REFRESH_CONCURRENCY: int = 4
+
+    KEMONO_SPECULATIVE: bool = True
+
+    BATCH_MAX_SIZE: int = 50
+    BATCH_CONCURRENCY: int = 8
+
+    PREFETCH: bool = False
+    PREFETCH_QUEUE_SIZE: int = 32
+    PREFETCH_CONCURRENCY: int = 2
+    PREFETCH_CREATOR_POSTS: int = 0
+    PREFETCH_CREATOR_INTERVAL: int = 600
+    PREFETCH_WARM_UP: str = ""
+    WARM_UP_TOKEN: str = ""
+
+    PAGE_CACHE_SIZE: int = 512
+    ARTICLE_STREAMING: bool = False
+    PREVIEW_MODE: bool = False
+    PREVIEW_USER_AGENTS: str = "TelegramBot"
+    PREVIEW_CACHE_TTL: int = 3600
+    STREAM_CHUNK_SIZE: int = 16384
+    PAGE_CACHE_CONTROL: str = "public, max-age=300, stale-while-revalidate=3600"
+    PAGE_FEE_CACHE_CONTROL: str = "public, max-age=1800, stale-while-revalidate=86400"
+    IMAGE_PROXY: bool = False
+    IMAGE_PROXY_URL: str = ""
+    IMAGE_CACHE_PATH: str = ""
+    IMAGE_CACHE_SIZE: int = 512 * 1024 * 1024
+    IMAGE_PREVIEW_WIDTH: int = 0
+    IMAGE_CACHE_CONTROL: str = "public, max-age=604800"
+    COMPRESSION_ENCODINGS: str = "br,zstd,gzip"
+    COMPRESSION_MIN_SIZE: int = 1024
 
 
 env_config = EnvConfig()
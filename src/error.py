@@ -13,6 +13,12 @@ class APIHelperTimedOut(APIHelperException):
     pass
 
 
+class CircuitOpenError(APIHelperException):
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        super().__init__(f"Circuit breaker for {upstream} is open")
+
+
 class ResponseException(APIHelperException):
     code: int = 0
     message: str = ""
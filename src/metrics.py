@@ -0,0 +1,177 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from src.env import env_config
+
+__all__ = (
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "registry",
+    "REQUESTS",
+    "IN_FLIGHT",
+    "UPSTREAM_LATENCY",
+    "STAGE_LATENCY",
+    "REDIRECTS",
+    "timer",
+)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+Labels = Tuple[str, ...]
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{k}="{escape(str(v))}"' for k, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        if not env_config.METRICS:
+            return
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels: str, value: float = 1) -> None:
+        self.inc(*labels, value=-value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self.counts: Dict[Labels, List[int]] = {}
+        self.sums: Dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not env_config.METRICS:
+            return
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self) -> Iterator[str]:
+        names = self.labels + ("le",)
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{format_labels(names, labels + (le,))} {total}"
+            label_text = format_labels(self.labels, labels)
+            yield f"{self.name}_sum{label_text} {self.sums[labels]}"
+            yield f"{self.name}_count{label_text} {total}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, extra: Sequence[Metric] = ()) -> str:
+        return "\n".join(i.render() for i in (*self.metrics, *extra)) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(
+    Counter(
+        "fixfanbox_requests_total",
+        "HTTP requests by route and status",
+        ("route", "status"),
+    )
+)
+IN_FLIGHT = registry.register(
+    Gauge("fixfanbox_requests_in_flight", "HTTP requests being served")
+)
+UPSTREAM_LATENCY = registry.register(
+    Histogram(
+        "fixfanbox_upstream_request_seconds",
+        "Upstream request latency by host and status",
+        ("host", "status"),
+    )
+)
+STAGE_LATENCY = registry.register(
+    Histogram("fixfanbox_stage_seconds", "Time spent in each serving stage", ("stage",))
+)
+REDIRECTS = registry.register(
+    Counter("fixfanbox_redirects_total", "Redirects to fanbox by reason", ("reason",))
+)
+
+_disabled = nullcontext()
+
+
+@contextmanager
+def _timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage)
+
+
+def timer(stage: str):
+    """Time a block into STAGE_LATENCY, a shared no-op when METRICS is off."""
+    if not env_config.METRICS:
+        return _disabled
+    return _timer(stage)
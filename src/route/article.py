@@ -1,21 +1,27 @@
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
 from persica.factory.component import AsyncInitializingComponent
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import Response, StreamingResponse
 
-from .base import get_redirect_response
+from .base import get_redirect_response, is_preview_request
 
-from src.api.httpxrequest import HTTPXRequest
+from src.api.cache import RenderedPage
+from src.api.compression import choose_encoding
+from src.api.prefetch import Prefetcher
 from src.api.render import RenderArticle
 
 from src.env import env_config
 from src.core.web_app import WebApp
-from src.error import ArticleError, ResponseException
+from src.error import APIHelperException, ArticleError, ResponseException
 from src.log import logger
 
 
 class ArticlePlugin(AsyncInitializingComponent):
-    def __init__(self, web_app: WebApp, render: RenderArticle):
-        self._render = render
+    def __init__(self, web_app: WebApp, render: RenderArticle, prefetcher: Prefetcher):
+        self.render = render
+        self.prefetcher = prefetcher
         web_app.app.add_api_route("/@{username}/posts/{post_id}", self.parse_article)
         web_app.app.add_api_route("/posts/{post_id}", self.parse_article)
         web_app.app.add_api_route(
@@ -23,34 +29,110 @@ class ArticlePlugin(AsyncInitializingComponent):
         )
         web_app.app.add_api_route("/posts/{post_id}/json", self.parse_article_json)
 
-    @property
-    def render(self) -> "RenderArticle":
-        if env_config.START_WEB:
-            return self._render
-        h = HTTPXRequest()
-        self._render.fanbox_api.request = h
-        self._render.kemono_api.request = h
-        return self._render
+    @staticmethod
+    def is_not_modified(
+        request: "Request", page: "RenderedPage", etag: Optional[str] = None
+    ) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etags = {i.strip().removeprefix("W/") for i in if_none_match.split(",")}
+            return (etag or page.etag) in etags or "*" in etags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(page.last_modified) <= since
+        return False
+
+    @staticmethod
+    def get_cache_control(fee_required: bool) -> str:
+        if fee_required:
+            return env_config.PAGE_FEE_CACHE_CONTROL
+        return env_config.PAGE_CACHE_CONTROL
 
-    async def parse_article(self, post_id: str, request: Request):
+    @classmethod
+    def get_page_response(
+        cls,
+        request: "Request",
+        page: "RenderedPage",
+        media_type: str,
+    ) -> Response:
+        """Serve a cached page, the precompressed variant is negotiated from
+        Accept-Encoding so each page is compressed once, not per request."""
+        encoding = choose_encoding(
+            request.headers.get("accept-encoding"), len(page.body)
+        )
+        etag = page.get_etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(page.last_modified, usegmt=True),
+            "Cache-Control": cls.get_cache_control(page.fee_required),
+            "Vary": "Accept-Encoding",
+        }
+        if cls.is_not_modified(request, page, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(page.get_body(encoding), media_type=media_type, headers=headers)
+
+    async def stream_article(
+        self, post_id: str, request: Request, username: Optional[str] = None
+    ) -> Response:
+        page = self.render.page_cache.get(f"html:{post_id}")
+        if page is not None:
+            return self.get_page_response(request, page, "text/html")
+        post_info = await self.render.get_post_info(post_id, username)
+        return StreamingResponse(
+            self.render.stream_article(post_info),
+            media_type="text/html",
+            headers={"Cache-Control": self.get_cache_control(post_info.feeRequired)},
+        )
+
+    async def parse_article(
+        self, post_id: str, request: Request, username: Optional[str] = None
+    ):
         try:
-            return HTMLResponse(await self.render.process_article(post_id))
+            if is_preview_request(request):
+                page = await self.render.get_preview_page(post_id, username)
+                return self.get_page_response(request, page, "text/html")
+            if env_config.ARTICLE_STREAMING:
+                response = await self.stream_article(post_id, request, username)
+            else:
+                page = await self.render.get_article_page(post_id, username)
+                response = self.get_page_response(request, page, "text/html")
+            self.prefetcher.prefetch(post_id)
+            return response
         except ResponseException as e:
             logger.warning(e.message)
-            return get_redirect_response(request)
+            return get_redirect_response(request, "upstream")
+        except APIHelperException as e:
+            logger.warning("Upstream unavailable for post_id[%s]: %s", post_id, e)
+            return get_redirect_response(request, "upstream")
         except ArticleError as e:
             logger.warning(e.msg)
-            return get_redirect_response(request)
+            return get_redirect_response(request, "not_found")
         except Exception as _:
             logger.exception("Failed to get article post_id[%s]", post_id)
             return get_redirect_response(request)
 
-    async def parse_article_json(self, post_id: str, request: Request):
+    async def parse_article_json(
+        self,
+        post_id: str,
+        request: Request,
+        username: Optional[str] = None,
+        fields: Optional[str] = None,
+    ):
         try:
-            return await self.render.get_post_info(post_id)
+            page = await self.render.get_json_page(post_id, username, fields)
+            return self.get_page_response(request, page, "application/json")
+        except APIHelperException as e:
+            logger.warning("Upstream unavailable for post_id[%s]: %s", post_id, e)
+            return get_redirect_response(request, "upstream")
         except ArticleError as e:
             logger.warning(e.msg)
-            return get_redirect_response(request)
+            return get_redirect_response(request, "not_found")
         except Exception as _:
             logger.exception("Failed to get article post_id[%s]", post_id)
             return get_redirect_response(request)
@@ -6,6 +6,7 @@ from starlette.responses import RedirectResponse
 
 from src.core.web_app import WebApp
 from src.env import env_config
+from src.metrics import REDIRECTS
 
 if TYPE_CHECKING:
     from starlette.middleware.base import RequestResponseEndpoint
@@ -13,18 +14,35 @@ if TYPE_CHECKING:
     from starlette.responses import Response
 
 
-def get_redirect_response(request: "Request") -> RedirectResponse:
+def get_redirect_response(
+    request: "Request", reason: str = "error"
+) -> RedirectResponse:
+    REDIRECTS.inc(reason)
     new = request.url.replace(netloc="official.fanbox.cc")
     return RedirectResponse(url=new, status_code=302)
 
 
+def is_preview_request(request: "Request") -> bool:
+    """Crawlers only read the OG/twitter meta tags, serve them the head only."""
+    if request.query_params.get("preview") in ("1", "true"):
+        return True
+    if not env_config.PREVIEW_MODE:
+        return False
+    user_agent = (request.headers.get("User-Agent") or "").lower()
+    return any(
+        agent.strip().lower() in user_agent
+        for agent in env_config.PREVIEW_USER_AGENTS.split(",")
+        if agent.strip()
+    )
+
+
 class UserAgentMiddleware(BaseHTTPMiddleware):
     async def dispatch(
         self, request: "Request", call_next: "RequestResponseEndpoint"
     ) -> "Response":
         user_agent = request.headers.get("User-Agent")
         if (not user_agent) or ("telegram" not in user_agent.lower()):
-            return get_redirect_response(request)
+            return get_redirect_response(request, "user_agent")
         return await call_next(request)
 
 
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+from persica.factory.component import AsyncInitializingComponent
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.error import APIHelperException, ArticleError
+from src.log import logger
+
+
+class BatchPlugin(AsyncInitializingComponent):
+    """Resolve many posts in one request, results are streamed as NDJSON in
+    completion order so fast (cached) posts are not held back by slow ones."""
+
+    def __init__(self, web_app: WebApp, render: RenderArticle):
+        self.render = render
+        web_app.app.add_api_route("/posts/batch", self.post_batch, methods=["POST"])
+        web_app.app.add_api_route("/posts", self.get_batch)
+
+    @staticmethod
+    def get_error_line(post_id: str, error: str) -> bytes:
+        return json.dumps({"id": post_id, "error": error}).encode() + b"\n"
+
+    async def get_line(
+        self, post_id: str, fields: Optional[str], semaphore: asyncio.Semaphore
+    ) -> bytes:
+        try:
+            async with semaphore:
+                page = await self.render.get_json_page(post_id, fields=fields)
+        except ArticleError as e:
+            logger.warning(e.msg)
+            return self.get_error_line(post_id, "not_found")
+        except APIHelperException as e:
+            logger.warning("Upstream unavailable for post_id[%s]: %s", post_id, e)
+            return self.get_error_line(post_id, "upstream_unavailable")
+        except Exception as _:
+            logger.exception("Failed to get article post_id[%s]", post_id)
+            return self.get_error_line(post_id, "error")
+        return (
+            b'{"id":' + json.dumps(post_id).encode() + b',"post":' + page.body + b"}\n"
+        )
+
+    async def iter_batch(
+        self, post_ids: List[str], fields: Optional[str]
+    ) -> AsyncIterator[bytes]:
+        semaphore = asyncio.Semaphore(env_config.BATCH_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(self.get_line(post_id, fields, semaphore))
+            for post_id in post_ids
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # the client went away, stop waiting on the remaining posts
+            for task in tasks:
+                task.cancel()
+
+    def get_batch_response(
+        self, post_ids: List[str], fields: Optional[str]
+    ) -> Response:
+        post_ids = list(dict.fromkeys(i.strip() for i in post_ids if i.strip()))
+        if not post_ids:
+            return JSONResponse({"error": "no post ids"}, status_code=400)
+        if len(post_ids) > env_config.BATCH_MAX_SIZE:
+            return JSONResponse(
+                {"error": f"at most {env_config.BATCH_MAX_SIZE} post ids"},
+                status_code=400,
+            )
+        return StreamingResponse(
+            self.iter_batch(post_ids, fields), media_type="application/x-ndjson"
+        )
+
+    async def get_batch(self, ids: str = "", fields: Optional[str] = None):
+        return self.get_batch_response(ids.split(","), fields)
+
+    async def post_batch(self, request: Request, fields: Optional[str] = None):
+        """Body is a JSON list of post ids or {"ids": [...], "fields": "..."}."""
+        try:
+            data = json.loads(await request.body())
+            if isinstance(data, dict):
+                fields = data.get("fields", fields)
+                data = data["ids"]
+            if not isinstance(data, list) or not isinstance(fields, (str, type(None))):
+                raise TypeError
+            post_ids = [str(i) for i in data]
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": "invalid body"}, status_code=400)
+        return self.get_batch_response(post_ids, fields)
@@ -15,4 +15,4 @@ class ErrorRoutePlugin(BaseComponent):
 
     @staticmethod
     async def validation_exception_handler(request: "Request", _):
-        return get_redirect_response(request)
+        return get_redirect_response(request, "invalid_request")
@@ -0,0 +1,36 @@
+from persica.factory.component import AsyncInitializingComponent
+from starlette.responses import (
+    FileResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+
+from src.api.image import IMAGE_HOSTS, ImageProxy
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.log import logger
+
+
+class ImageRoutePlugin(AsyncInitializingComponent):
+    def __init__(self, web_app: WebApp, image_proxy: ImageProxy):
+        self.image_proxy = image_proxy
+        if env_config.IMAGE_PROXY:
+            web_app.app.add_api_route("/img/{host}/{path:path}", self.get_image)
+
+    async def get_image(self, host: str, path: str):
+        if host not in IMAGE_HOSTS:
+            return Response(status_code=404)
+        headers = {"Cache-Control": env_config.IMAGE_CACHE_CONTROL}
+        try:
+            image = await self.image_proxy.get_image(host, path)
+        except Exception as e:
+            logger.warning("Failed to proxy image %s/%s: %r", host, path, e)
+            return RedirectResponse(f"https://{host}/{path}", status_code=302)
+        if image.path is not None:
+            return FileResponse(
+                image.path, media_type=image.media_type, headers=headers
+            )
+        return StreamingResponse(
+            image.stream, media_type=image.media_type, headers=headers
+        )
@@ -0,0 +1,75 @@
+from typing import List
+
+from persica.factory.component import AsyncInitializingComponent
+from starlette.responses import PlainTextResponse
+
+from src.api.prefetch import Prefetcher
+from src.api.refresh import RefreshQueue
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.metrics import Counter, Gauge, Metric, registry
+
+
+class MetricsPlugin(AsyncInitializingComponent):
+    def __init__(
+        self,
+        web_app: WebApp,
+        render: RenderArticle,
+        refresh_queue: RefreshQueue,
+        prefetcher: Prefetcher,
+    ):
+        self.render = render
+        self.refresh_queue = refresh_queue
+        self.prefetcher = prefetcher
+        if env_config.METRICS:
+            web_app.app.add_api_route("/metrics", self.metrics)
+
+    def get_state_metrics(self) -> List[Metric]:
+        """Cache and queue state is read from the components at scrape time."""
+        cache_requests = Counter(
+            "fixfanbox_cache_requests_total",
+            "Cache lookups by cache and result",
+            ("cache", "result"),
+        )
+        cache_size = Gauge("fixfanbox_cache_entries", "Cached entries", ("cache",))
+        cache_evictions = Counter(
+            "fixfanbox_cache_evictions_total", "Cache evictions", ("cache",)
+        )
+        for name, cache in (
+            ("post", self.render.post_cache),
+            ("page", self.render.page_cache),
+        ):
+            stats = cache.stats
+            cache_size.set(name, value=stats.pop("size"))
+            cache_evictions.set(name, value=stats.pop("evictions"))
+            for result, value in stats.items():
+                cache_requests.set(name, result, value=value)
+        in_flight = Gauge(
+            "fixfanbox_upstream_loads_in_flight",
+            "Coalesced loads in flight by kind",
+            ("kind",),
+        )
+        in_flight.set("post", value=len(self.render.post_flight))
+        in_flight.set("page", value=len(self.render.page_flight))
+        queued = Gauge(
+            "fixfanbox_background_tasks", "Queued background tasks", ("queue",)
+        )
+        dropped = Counter(
+            "fixfanbox_background_tasks_dropped_total",
+            "Background tasks dropped because the queue was full",
+            ("queue",),
+        )
+        for name, queue in (
+            ("refresh", self.refresh_queue),
+            ("prefetch", self.prefetcher.queue),
+        ):
+            queued.set(name, value=len(queue))
+            dropped.set(name, value=queue.dropped)
+        return [cache_requests, cache_size, cache_evictions, in_flight, queued, dropped]
+
+    async def metrics(self):
+        return PlainTextResponse(
+            registry.render(self.get_state_metrics()),
+            media_type="text/plain; version=0.0.4",
+        )
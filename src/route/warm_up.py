@@ -0,0 +1,29 @@
+import hmac
+
+from persica.factory.component import AsyncInitializingComponent
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from src.api.prefetch import Prefetcher, parse_warm_up_items
+from src.core.web_app import WebApp
+from src.env import env_config
+
+
+class WarmUpPlugin(AsyncInitializingComponent):
+    def __init__(self, web_app: WebApp, prefetcher: Prefetcher):
+        self.prefetcher = prefetcher
+        if env_config.WARM_UP_TOKEN:
+            web_app.app.add_api_route("/warm-up", self.warm_up, methods=["POST"])
+
+    @staticmethod
+    def is_authorized(request: "Request") -> bool:
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        return hmac.compare_digest(token.encode(), env_config.WARM_UP_TOKEN.encode())
+
+    async def warm_up(self, request: Request):
+        """Queue post ids (and @creatorId entries) from the request body."""
+        if not self.is_authorized(request):
+            return Response(status_code=403)
+        items = parse_warm_up_items((await request.body()).decode())
+        self.prefetcher.schedule_warm_up(items)
+        return JSONResponse({"scheduled": len(items)}, status_code=202)
@@ -0,0 +1,110 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'article.jinja2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_post = resolve('post')
+    l_0_author = resolve('author')
+    l_0_image_for_share = resolve('image_for_share')
+    l_0_description = resolve('description')
+    l_0_published_time = resolve('published_time')
+    l_0_channel = resolve('channel')
+    l_0_head_only = resolve('head_only')
+    l_0_article = resolve('article')
+    l_0_icon_url = resolve('icon_url')
+    l_0_site_name = missing
+    pass
+    yield '<!DOCTYPE html>\n<html lang="en">\n<!--\n _______  __  ___   ___  _______    ___      .__   __. .______     ______   ___   ___\n|   ____||  | \\  \\ /  / |   ____|  /   \\     |  \\ |  | |   _  \\   /  __  \\  \\  \\ /  /\n|  |__   |  |  \\  V  /  |  |__    /  ^  \\    |   \\|  | |  |_)  | |  |  |  |  \\  V  /\n|   __|  |  |   >   <   |   __|  /  /_\\  \\   |  . `  | |   _  <  |  |  |  |   >   <\n|  |     |  |  /  .  \\  |  |    /  _____  \\  |  |\\   | |  |_)  | |  `--\'  |  /  .  \\\n|__|     |__| /__/ \\__\\ |__|   /__/     \\__\\ |__| \\__| |______/   \\______/  /__/ \\__\\\n\nEmbed Fanbox posts on Telegram\n-->\n<head>\n    <meta charset="UTF-8">\n    <title></title>\n    <link rel="canonical" href="'
+    yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'url'))
+    yield '"/>\n    <meta property="theme-color" content="#00a8fc"/>\n    <meta property="twitter:site" content="'
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield '"/>\n    <meta property="twitter:creator" content="'
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield '"/>\n    <meta property="twitter:title" content="'
+    yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'title'))
+    yield ' ('
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield ')"/>\n    <meta property="twitter:image" content="'
+    yield str((undefined(name='image_for_share') if l_0_image_for_share is missing else l_0_image_for_share))
+    yield '"/>\n    <meta property="twitter:card" content="summary_large_image"/>\n\n    <meta property="og:url" content="'
+    yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'url'))
+    yield '"/>\n    <meta property="og:image" content="'
+    yield str((undefined(name='image_for_share') if l_0_image_for_share is missing else l_0_image_for_share))
+    yield '"/>\n    <meta property="og:title" content="'
+    yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'title'))
+    yield ' ('
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield ')"/>\n    <meta property="og:description" content="'
+    yield str((undefined(name='description') if l_0_description is missing else l_0_description))
+    yield '"/>\n    '
+    l_0_site_name = 'pixivFANBOX'
+    context.vars['site_name'] = l_0_site_name
+    context.exported_vars.add('site_name')
+    yield '\n    <meta property="og:site_name" content="'
+    yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'title'))
+    yield ' - '
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield ' - '
+    yield str((undefined(name='site_name') if l_0_site_name is missing else l_0_site_name))
+    yield '"/>\n\n    <meta property="author" content="'
+    yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+    yield '">\n    <!-- Telegram -->\n    <meta property="al:android:app_name" content="Medium"/>\n    <meta property="article:published_time" content="'
+    yield str((undefined(name='published_time') if l_0_published_time is missing else l_0_published_time))
+    yield '"/>\n    <meta name="telegram:channel" content="@'
+    yield str((undefined(name='channel') if l_0_channel is missing else l_0_channel))
+    yield '"/>\n</head>\n'
+    if (not (undefined(name='head_only') if l_0_head_only is missing else l_0_head_only)):
+        pass
+        yield '\n<body>\n<section class="section-backgroundImage">\n    <figure class="graf--layoutFillWidth"></figure>\n</section>\n<section class="section--first">\n    If you can see this, your browser is doing something weird with your user agent.\n    <a href="'
+        yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'url'))
+        yield '">View original post</a>\n</section>\n<article>\n    <!-- cover image -->\n    <section class="is-imageBackgrounded">\n        <figure>\n            <img src="'
+        yield str((undefined(name='image_for_share') if l_0_image_for_share is missing else l_0_image_for_share))
+        yield '" alt="coverImage"/>\n        </figure>\n    </section>\n    <!-- article content -->\n    '
+        for l_1_fragment in (undefined(name='article') if l_0_article is missing else l_0_article):
+            _loop_vars = {}
+            pass
+            yield str(l_1_fragment)
+        l_1_fragment = missing
+        yield '\n    <!-- stat -->\n    '
+        yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'stat'))
+        yield '\n    <p><a href="'
+        yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'url'))
+        yield '">查看原文</a></p>\n    <!-- author -->\n    <details>\n        <summary>作者信息</summary>\n        '
+        if (undefined(name='icon_url') if l_0_icon_url is missing else l_0_icon_url):
+            pass
+            yield '\n            <img src="'
+            yield str((undefined(name='icon_url') if l_0_icon_url is missing else l_0_icon_url))
+            yield '" alt="profile picture"/>\n        '
+        yield '\n        <p>\n            <a href="'
+        yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'user_url'))
+        yield '">'
+        yield str(environment.getattr((undefined(name='author') if l_0_author is missing else l_0_author), 'name'))
+        yield '</a>\n        </p>\n    </details>\n    <!-- related posts -->\n    '
+        if environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'nextPost'):
+            pass
+            yield '\n        <related>\n            <a href="'
+            yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'user_url'))
+            yield 'posts/'
+            yield str(environment.getattr(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'nextPost'), 'id'))
+            yield '">'
+            yield str(environment.getattr(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'nextPost'), 'title'))
+            yield '</a>\n        </related>\n        <br/>\n    '
+        yield '\n    '
+        if environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'prevPost'):
+            pass
+            yield '\n        <related>\n            <a href="'
+            yield str(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'user_url'))
+            yield 'posts/'
+            yield str(environment.getattr(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'prevPost'), 'id'))
+            yield '">'
+            yield str(environment.getattr(environment.getattr((undefined(name='post') if l_0_post is missing else l_0_post), 'prevPost'), 'title'))
+            yield '</a>\n        </related>\n        <br/>\n    '
+        yield '\n</article>\n</body>\n'
+    yield '\n</html>'
+
+blocks = {}
+debug_info = '16=22&18=24&19=26&20=28&21=32&24=34&25=36&26=38&27=42&28=44&29=48&31=54&34=56&35=58&37=60&44=63&50=65&54=67&56=73&57=75&61=77&62=80&65=83&69=87&71=90&75=97&77=100'
\ No newline at end of file
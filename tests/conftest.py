@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api.cache import PageCache, PostCache
+from src.api.fanbox import FanBoxApi
+from src.api.httpxrequest import HTTPXRequest
+from src.api.kemono import KemonoApi
+from src.api.models import FanboxPost, FanboxUser, KemonoPost
+from src.api.prefetch import Prefetcher
+from src.api.refresh import RefreshQueue
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.route.article import ArticlePlugin
+
+
+def make_post_data(post_id: str = "9431597", fee_required: int = 0) -> Dict[str, Any]:
+    return {
+        "id": post_id,
+        "publishedDatetime": "2022-10-05T20:21:19+09:00",
+        "title": "test post",
+        "body": {
+            "blocks": [
+                {"type": "p", "text": "hello"},
+                {"type": "image", "imageId": "img1"},
+                {"type": "header", "text": "world"},
+            ],
+            "imageMap": {
+                "img1": {
+                    "id": "img1",
+                    "extension": "png",
+                    "width": 100,
+                    "height": 100,
+                    "originalUrl": "https://downloads.fanbox.cc/images/post/1/img1.png",
+                    "thumbnailUrl": "https://downloads.fanbox.cc/images/post/1/w/1200/img1.jpeg",
+                }
+            },
+        },
+        "imageForShare": "https://pixiv.pximg.net/c/1200x630/fanbox/public/images/post/1/cover.jpeg",
+        "creatorId": "miyuuu",
+        "excerpt": "excerpt",
+        "feeRequired": fee_required,
+        "likeCount": 10,
+        "user": {"name": "miyu", "userId": "1234", "iconUrl": None},
+        "nextPost": None,
+        "prevPost": None,
+    }
+
+
+@pytest.fixture
+def post() -> FanboxPost:
+    return FanboxPost(**make_post_data())
+
+
+@pytest.fixture
+def paid_post() -> FanboxPost:
+    return FanboxPost(**make_post_data("9431598", fee_required=500))
+
+
+class FakeFanBoxApi(FanBoxApi):
+    def __init__(self):
+        super().__init__(HTTPXRequest())
+        self.calls = 0
+        self.broken = False
+        self.paid = set()
+        self.next_posts: Dict[str, str] = {}
+        self.creator_posts: List[str] = []
+
+    async def get_fanbox_post(self, post_id: str) -> FanboxPost:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if post_id == "404" or self.broken:
+            raise AssertionError
+        fee_required = 500 if post_id in self.paid else 0
+        data = make_post_data(post_id, fee_required)
+        if post_id in self.next_posts:
+            data["nextPost"] = {
+                "id": self.next_posts[post_id],
+                "publishedDatetime": data["publishedDatetime"],
+                "title": "next post",
+            }
+        post = FanboxPost(**data)
+        self.remember_user_id(post.creatorId, post.user.userId)
+        return post
+
+    async def get_fanbox_user(self, username: str) -> FanboxUser:
+        self.remember_user_id(username, "1234")
+        return FanboxUser(
+            coverImageUrl=None,
+            creatorId=username,
+            description="",
+            hasAdultContent=False,
+            user={"name": "miyu", "userId": "1234", "iconUrl": None},
+        )
+
+    async def get_creator_post_ids(self, creator_id: str, limit: int = 10) -> List[str]:
+        return self.creator_posts[:limit]
+
+
+class FakeKemonoApi(KemonoApi):
+    def __init__(self, httpx_request: HTTPXRequest):
+        super().__init__(httpx_request)
+        self.calls = []
+
+    async def get_kemono_user_post(self, user: str, post: str) -> KemonoPost:
+        self.calls.append((user, post))
+        await asyncio.sleep(0.01)
+        return KemonoPost(
+            post={
+                "id": post,
+                "user": user,
+                "title": "kemono",
+                "content": "<p>paid</p>",
+            },
+            previews=[],
+        )
+
+
+@pytest.fixture
+def fanbox_api() -> FakeFanBoxApi:
+    return FakeFanBoxApi()
+
+
+@pytest.fixture
+def render(fanbox_api: FakeFanBoxApi) -> RenderArticle:
+    return RenderArticle(
+        fanbox_api,
+        FakeKemonoApi(fanbox_api.request),
+        PostCache(),
+        PageCache(),
+        RefreshQueue(),
+    )
+
+
+@pytest.fixture
+def prefetcher(render: RenderArticle) -> Prefetcher:
+    return Prefetcher(render)
+
+
+@pytest.fixture
+def client(render: RenderArticle, prefetcher: Prefetcher) -> TestClient:
+    web_app = WebApp()
+    ArticlePlugin(web_app, render, prefetcher)
+    return TestClient(web_app.app, follow_redirects=False)
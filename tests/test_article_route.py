@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api.prefetch import Prefetcher
+from src.api.render import RenderArticle
+from src.env import env_config
+
+from tests.conftest import FakeFanBoxApi
+
+
+def expire(render: RenderArticle, post_id: str) -> None:
+    render.post_cache.peek(post_id).expires_at = time.time() - 1
+    render.page_cache.delete(f"html:{post_id}")
+
+
+class TestArticleRoute:
+    @staticmethod
+    def test_article(client: TestClient, fanbox_api: FakeFanBoxApi):
+        resp = client.get("/posts/1")
+        assert resp.status_code == 200
+        assert "test post" in resp.text
+        assert resp.headers["etag"]
+        assert "max-age" in resp.headers["cache-control"]
+
+        resp = client.get("/posts/1", headers={"If-None-Match": resp.headers["etag"]})
+        assert resp.status_code == 304
+        assert fanbox_api.calls == 1
+
+    @staticmethod
+    def test_streaming(client: TestClient, render: RenderArticle, monkeypatch):
+        expected = client.get("/posts/1").text
+        render.page_cache.delete("html:1")
+        monkeypatch.setattr(env_config, "ARTICLE_STREAMING", True)
+        resp = client.get("/posts/1")
+        assert resp.status_code == 200
+        assert resp.text == expected
+        assert render.page_cache.get("html:1").body.decode() == expected
+
+    @staticmethod
+    def test_preview(client: TestClient, render: RenderArticle, monkeypatch):
+        monkeypatch.setattr(env_config, "PREVIEW_MODE", True)
+        render.fanbox_api.paid.add("2")
+        resp = client.get(
+            "/posts/2", headers={"User-Agent": "TelegramBot (like TwitterBot)"}
+        )
+        assert resp.status_code == 200
+        assert 'property="og:title"' in resp.text
+        assert "<body>" not in resp.text
+        assert render.kemono_api.calls == []
+        assert "<body>" in client.get("/posts/2").text
+
+    @staticmethod
+    def test_json(client: TestClient):
+        resp = client.get("/posts/1/json")
+        assert resp.status_code == 200
+        assert resp.json()["id"] == "1"
+
+    @staticmethod
+    def test_json_fields(client: TestClient, render: RenderArticle):
+        resp = client.get("/posts/1/json?fields=title,excerpt,body.images,unknown")
+        assert resp.json() == {
+            "title": "test post",
+            "excerpt": "excerpt",
+            "body": {"images": None},
+        }
+        assert render.page_cache.get("json:1:body.images,excerpt,title") is not None
+        render.post_cache.delete("1")
+        asyncio.run(render.load_post_info("1"))
+        assert render.page_cache.get("json:1:body.images,excerpt,title") is None
+
+    @staticmethod
+    def test_json_gzip(client: TestClient, render: RenderArticle, monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        monkeypatch.setattr(env_config, "COMPRESSION_MIN_SIZE", 0)
+        resp = client.get("/posts/1/json", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert resp.json()["id"] == "1"
+        page = render.page_cache.get("json:1")
+        assert resp.headers["etag"] == page.get_etag("gzip") != page.etag
+        assert "gzip" in page.encodings
+
+        resp = client.get(
+            "/posts/1/json",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]},
+        )
+        assert resp.status_code == 304
+
+        resp = client.get("/posts/1/json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+        assert resp.headers["etag"] == page.etag
+
+    @staticmethod
+    def test_article_precompressed(
+        client: TestClient, render: RenderArticle, monkeypatch
+    ):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        monkeypatch.setattr(env_config, "COMPRESSION_MIN_SIZE", 0)
+        resp = client.get("/posts/1", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "test post" in resp.text
+        page = render.page_cache.get("html:1")
+        assert page.encodings["gzip"] is page.get_body("gzip")
+
+    @staticmethod
+    def test_prefetch_neighbours(
+        client: TestClient,
+        prefetcher: Prefetcher,
+        fanbox_api: FakeFanBoxApi,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(env_config, "PREFETCH", True)
+        fanbox_api.next_posts["1"] = "2"
+        with client:
+            assert client.get("/posts/1").status_code == 200
+            assert "2" in prefetcher.queue.tasks
+            # served from the prefetched (or still in-flight) load
+            assert client.get("/posts/2").status_code == 200
+        assert fanbox_api.calls == 2
+
+    @staticmethod
+    def test_not_found(client: TestClient):
+        resp = client.get("/posts/404")
+        assert resp.status_code == 302
+        assert resp.headers["location"].startswith("http://official.fanbox.cc")
+
+    @staticmethod
+    def test_stale_while_revalidate(
+        client: TestClient,
+        render: RenderArticle,
+        fanbox_api: FakeFanBoxApi,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(env_config, "CACHE_STALE_WHILE_REVALIDATE", True)
+        assert client.get("/posts/1").status_code == 200
+        expire(render, "1")
+        assert client.get("/posts/1").status_code == 200
+        assert render.post_cache.stats["stale_hits"] == 1
+
+    @staticmethod
+    def test_stale_if_error(
+        client: TestClient,
+        render: RenderArticle,
+        fanbox_api: FakeFanBoxApi,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(env_config, "CACHE_STALE_WHILE_REVALIDATE", True)
+        monkeypatch.setattr(env_config, "CACHE_MAX_STALE", 0)
+        assert client.get("/posts/1").status_code == 200
+        expire(render, "1")
+        fanbox_api.broken = True
+        assert client.get("/posts/1").status_code == 200
+        assert fanbox_api.calls == 2
+
+
+@pytest.mark.asyncio
+class TestSpeculativeKemono:
+    @staticmethod
+    async def test_paid_post(render: RenderArticle, fanbox_api: FakeFanBoxApi):
+        fanbox_api.paid.add("2")
+        fanbox_api.remember_user_id("miyuuu", "1234")
+        post = await render.fetch_post_info("2", "miyuuu")
+        assert render.kemono_api.calls == [("1234", "2")]
+        assert post.body.blocks[0].text == "paid"
+
+    @staticmethod
+    async def test_free_post(render: RenderArticle, fanbox_api: FakeFanBoxApi):
+        fanbox_api.remember_user_id("miyuuu", "1234")
+        post = await render.fetch_post_info("1", "miyuuu")
+        assert post.body.blocks[0].text == "hello"
+
+    @staticmethod
+    async def test_unknown_creator(render: RenderArticle, fanbox_api: FakeFanBoxApi):
+        fanbox_api.paid.add("2")
+        post = await render.fetch_post_info("2", "someone")
+        assert render.kemono_api.calls == [("1234", "2")]
+        assert post.body.blocks[0].text == "paid"
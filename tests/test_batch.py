@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.route.batch import BatchPlugin
+
+from tests.conftest import FakeFanBoxApi
+
+
+@pytest.fixture
+def batch_client(render: RenderArticle) -> TestClient:
+    web_app = WebApp()
+    BatchPlugin(web_app, render)
+    return TestClient(web_app.app)
+
+
+def read_lines(resp) -> dict:
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    return {i["id"]: i for i in map(json.loads, resp.text.splitlines())}
+
+
+class TestBatchRoute:
+    @staticmethod
+    def test_post(batch_client: TestClient, fanbox_api: FakeFanBoxApi):
+        resp = batch_client.post("/posts/batch", json=["1", "2", "404", "1"])
+        lines = read_lines(resp)
+        assert lines["1"]["post"]["id"] == "1"
+        assert lines["2"]["post"]["title"] == "test post"
+        assert lines["404"] == {"id": "404", "error": "not_found"}
+        assert fanbox_api.calls == 3
+
+    @staticmethod
+    def test_get_fields(batch_client: TestClient, render: RenderArticle):
+        resp = batch_client.get("/posts?ids=1,2&fields=title")
+        assert read_lines(resp)["2"] == {"id": "2", "post": {"title": "test post"}}
+        assert render.page_cache.get("json:1:title") is not None
+
+    @staticmethod
+    def test_dict_body(batch_client: TestClient, fanbox_api: FakeFanBoxApi):
+        resp = batch_client.post("/posts/batch", json={"ids": [1], "fields": "id"})
+        assert read_lines(resp)["1"]["post"] == {"id": "1"}
+        fanbox_api.broken = True
+        resp = batch_client.post("/posts/batch", json={"ids": ["2"]})
+        assert read_lines(resp)["2"]["error"] == "not_found"
+
+    @staticmethod
+    def test_invalid(batch_client: TestClient, monkeypatch):
+        monkeypatch.setattr(env_config, "BATCH_MAX_SIZE", 2)
+        assert batch_client.post("/posts/batch", content="{").status_code == 400
+        assert batch_client.post("/posts/batch", json="12").status_code == 400
+        assert batch_client.get("/posts?ids=").status_code == 400
+        assert batch_client.get("/posts?ids=1,2,3").status_code == 400
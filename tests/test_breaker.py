@@ -0,0 +1,69 @@
+import httpx
+import pytest
+
+from src.api.breaker import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitState,
+    UpstreamGuard,
+)
+from src.api.httpxrequest import HTTPXRequest
+from src.error import CircuitOpenError
+
+
+class TestCircuitBreaker:
+    @staticmethod
+    def test_open_and_half_open():
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.allow()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+
+    @staticmethod
+    def test_stays_open():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+
+class TestAdaptiveRateLimiter:
+    @staticmethod
+    def test_throttle_and_recover():
+        limiter = AdaptiveRateLimiter(rate=8, min_rate=1)
+        limiter.throttle()
+        limiter.throttle()
+        assert limiter.rate == 2
+        for _ in range(20):
+            limiter.recover()
+        assert limiter.rate == 8
+
+    @staticmethod
+    def test_retry_after():
+        limiter = AdaptiveRateLimiter(rate=8, min_rate=1)
+        limiter.throttle(retry_after=5)
+        assert limiter.get_delay() > 4
+
+
+@pytest.mark.asyncio
+class TestUpstreamGuard:
+    @staticmethod
+    async def test_open_breaker_fails_fast():
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(404)
+
+        request = HTTPXRequest(transport=httpx.MockTransport(handler))
+        guard = UpstreamGuard("kemono.su", 100)
+        guard.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        guard.breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            await guard.get(request, "https://kemono.su/api/v1/")
+        assert not calls
@@ -0,0 +1,97 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.api.cache import RenderedPage
+from src.api.compression import choose_encoding
+from src.core.middleware import CompressionMiddleware
+from src.env import env_config
+
+
+class TestChooseEncoding:
+    @staticmethod
+    def test_negotiate(monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("deflate, *;q=0.5") == "gzip"
+        assert choose_encoding("gzip;q=0, *") is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding(None) is None
+        assert choose_encoding("gzip", size=10) is None
+
+    @staticmethod
+    def test_disabled(monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "")
+        assert choose_encoding("gzip") is None
+
+
+class TestRenderedPage:
+    @staticmethod
+    def test_encoded_body_is_cached():
+        page = RenderedPage.from_body(b"a" * 1000, False)
+        body = page.get_body("gzip")
+        assert gzip.decompress(body) == page.body
+        assert page.get_body("gzip") is body
+        assert page.get_body() is page.body
+
+
+def make_client() -> TestClient:
+    async def page(_):
+        return PlainTextResponse("a" * 2000)
+
+    async def small(_):
+        return PlainTextResponse("a")
+
+    async def stream(_):
+        async def chunks():
+            for _ in range(3):
+                yield b"b" * 1000
+
+        return StreamingResponse(chunks(), media_type="text/html")
+
+    async def image(_):
+        return Response(b"c" * 2000, media_type="image/png")
+
+    app = Starlette(
+        routes=[
+            Route("/page", page),
+            Route("/small", small),
+            Route("/stream", stream),
+            Route("/image", image),
+        ],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    return TestClient(app)
+
+
+class TestCompressionMiddleware:
+    @staticmethod
+    def test_compress(monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        client = make_client()
+        resp = client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert int(resp.headers["content-length"]) < 2000
+        assert resp.text == "a" * 2000
+
+    @staticmethod
+    def test_skip(monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        client = make_client()
+        for path in ("/small", "/image"):
+            resp = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in resp.headers
+        resp = client.get("/page", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+
+    @staticmethod
+    def test_stream(monkeypatch):
+        monkeypatch.setattr(env_config, "COMPRESSION_ENCODINGS", "gzip")
+        resp = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.text == "b" * 3000
@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.api.httpxrequest import HTTPXRequest, LatencyTracker, deadline
+from src.env import env_config
+from src.error import APIHelperTimedOut
+
+
+@pytest.mark.asyncio
+class TestHTTPXRequest:
+    @staticmethod
+    async def test_host_pools():
+        request = HTTPXRequest()
+        fanbox = request.get_client("https://api.fanbox.cc/post.info")
+        assert fanbox is request.get_client("https://api.fanbox.cc/creator.get")
+        assert fanbox is not request.get_client("https://kemono.su/api/v1/")
+        assert request.client is request.get_client("https://example.com/")
+        await request.shutdown()
+        assert fanbox.is_closed
+
+
+class TestHTTPXRequestLoop:
+    @staticmethod
+    def test_rebuild_on_new_loop():
+        request = HTTPXRequest()
+
+        async def get_client():
+            return request.get_client("https://api.fanbox.cc/post.info")
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+        assert first is not second
+
+
+def make_request(handler) -> HTTPXRequest:
+    return HTTPXRequest(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+class TestHTTPXRequestRetry:
+    @staticmethod
+    async def test_retry(monkeypatch):
+        monkeypatch.setattr(env_config, "HTTP_RETRY_BACKOFF", 0)
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503 if len(calls) == 1 else 200)
+
+        request = make_request(handler)
+        response = await request.get("https://api.fanbox.cc/post.info")
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+    @staticmethod
+    async def test_retry_budget(monkeypatch):
+        monkeypatch.setattr(env_config, "HTTP_RETRY_BACKOFF", 0)
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503)
+
+        request = make_request(handler)
+        request.retry_budget.tokens = 0
+        response = await request.get("https://api.fanbox.cc/post.info")
+        assert response.status_code == 503
+        assert len(calls) == 1
+
+    @staticmethod
+    async def test_deadline():
+        async def handler(_: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(1)
+            return httpx.Response(200)
+
+        request = make_request(handler)
+        with deadline(0.05):
+            with pytest.raises(APIHelperTimedOut):
+                await request.get("https://kemono.su/api/v1/")
+
+    @staticmethod
+    async def test_hedge(monkeypatch):
+        monkeypatch.setattr(env_config, "HTTP_HEDGE", True)
+        calls = []
+
+        async def handler(_: httpx.Request) -> httpx.Response:
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return httpx.Response(200)
+
+        request = make_request(handler)
+        tracker = request.latency["kemono.su"] = LatencyTracker(min_samples=1)
+        tracker.record(0.01)
+        with deadline(0.5):
+            response = await request.get("https://kemono.su/api/v1/")
+        assert response.status_code == 200
+        assert len(calls) == 2
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from src.api.cache import FileCache
+from src.api.httpxrequest import HTTPXRequest
+from src.api.image import ImageProxy, get_image_url
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.route.image import ImageRoutePlugin
+
+IMAGE_URL = "https://downloads.fanbox.cc/images/post/1/w/1200/img1.jpeg"
+
+
+class TestGetImageUrl:
+    @staticmethod
+    def test_rewrite(monkeypatch):
+        assert get_image_url(IMAGE_URL) == IMAGE_URL
+        monkeypatch.setattr(env_config, "IMAGE_PROXY", True)
+        monkeypatch.setattr(env_config, "IMAGE_PROXY_URL", "https://fix.example")
+        assert get_image_url(IMAGE_URL) == (
+            "https://fix.example/img/downloads.fanbox.cc/images/post/1/w/1200/img1.jpeg"
+        )
+        assert get_image_url("https://example.com/a.png") == "https://example.com/a.png"
+        assert get_image_url(None) is None
+
+
+class TestFileCache:
+    @staticmethod
+    def test_eviction(tmp_path):
+        cache = FileCache(str(tmp_path), max_size=10)
+        for key in ("a", "b", "c"):
+            temp_path = cache.get_temp_path()
+            temp_path.write_bytes(b"12345")
+            cache.commit(key, temp_path)
+        assert cache.get("a") is None
+        assert cache.get("b").read_bytes() == b"12345"
+        assert cache.size == 10
+        assert cache.evictions == 1
+        assert len(FileCache(str(tmp_path), max_size=10)) == 2
+
+
+@pytest.fixture
+def image_client(tmp_path, monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.path.endswith("404.jpeg"):
+            return httpx.Response(404)
+        return httpx.Response(200, content=b"jpeg" * 1000)
+
+    monkeypatch.setattr(env_config, "IMAGE_PROXY", True)
+    monkeypatch.setattr(env_config, "IMAGE_CACHE_PATH", str(tmp_path))
+    web_app = WebApp()
+    proxy = ImageProxy(HTTPXRequest(transport=httpx.MockTransport(handler)))
+    ImageRoutePlugin(web_app, proxy)
+    client = TestClient(web_app.app, follow_redirects=False)
+    client.calls = calls
+    return client
+
+
+class TestImageRoute:
+    @staticmethod
+    def test_proxy_and_cache(image_client: TestClient):
+        path = "/img/downloads.fanbox.cc/images/post/1/w/1200/img1.jpeg"
+        for _ in range(2):
+            resp = image_client.get(path)
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "image/jpeg"
+            assert resp.content == b"jpeg" * 1000
+        assert len(image_client.calls) == 1
+        assert image_client.calls[0].headers["referer"] == "https://www.fanbox.cc/"
+
+    @staticmethod
+    def test_upstream_error_redirects(image_client: TestClient):
+        resp = image_client.get("/img/downloads.fanbox.cc/404.jpeg")
+        assert resp.status_code == 302
+        assert resp.headers["location"] == "https://downloads.fanbox.cc/404.jpeg"
+
+    @staticmethod
+    def test_unknown_host(image_client: TestClient):
+        resp = image_client.get("/img/example.com/a.png")
+        assert resp.status_code == 404
+        assert image_client.calls == []
@@ -0,0 +1,41 @@
+from src.api.kemono import KemonoApi
+from src.api.models import FanboxPostBodyBlockType, KemonoPost
+
+
+def make_kemono_post(content: str) -> KemonoPost:
+    return KemonoPost(
+        post={"id": "1", "user": "1234", "title": "kemono", "content": content},
+        previews=[
+            {"name": "cover.png", "path": "/aa/bb/cover.png", "type": "thumbnail"}
+        ],
+    )
+
+
+class TestParseKemonoPost:
+    @staticmethod
+    def test_blocks_in_document_order():
+        body = KemonoApi.parse_kemono_post(
+            make_kemono_post(
+                '<p>before <img src="https://kemono.su/data/a.png"> after</p>\n'
+                "<h2>header</h2><p>text <b>bold</b></p>"
+            )
+        )
+        assert [(i.type, i.text or i.imageId) for i in body.blocks] == [
+            (FanboxPostBodyBlockType.P, "before"),
+            (FanboxPostBodyBlockType.IMAGE, "a.png"),
+            (FanboxPostBodyBlockType.P, "after"),
+            (FanboxPostBodyBlockType.HEADER, "header"),
+            (FanboxPostBodyBlockType.P, "text <b>bold</b>"),
+            (FanboxPostBodyBlockType.IMAGE, "cover.png"),
+        ]
+        assert body.imageMap["a.png"].thumbnailUrl == "https://kemono.su/data/a.png"
+        assert body.imageMap["cover.png"].thumbnailUrl.startswith(
+            "https://img.kemono.su/thumbnail/data"
+        )
+
+    @staticmethod
+    def test_coalesce_empty_lines():
+        body = KemonoApi.parse_kemono_post(
+            make_kemono_post("<p>a</p>\n\n<p><br></p>\n<p> </p>\nb<br/>c")
+        )
+        assert [i.text for i in body.blocks[:-1]] == ["a", "b", "c"]
@@ -0,0 +1,51 @@
+from starlette.testclient import TestClient
+
+from src.api.prefetch import Prefetcher
+from src.api.render import RenderArticle
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.metrics import Counter, Histogram, timer
+from src.route.article import ArticlePlugin
+from src.route.metrics import MetricsPlugin
+
+
+class TestMetrics:
+    @staticmethod
+    def test_disabled_is_noop():
+        counter = Counter("test_total", "test", ("kind",))
+        counter.inc("a")
+        assert counter.values == {}
+        assert timer("stage") is timer("other")
+
+    @staticmethod
+    def test_histogram(monkeypatch):
+        monkeypatch.setattr(env_config, "METRICS", True)
+        histogram = Histogram("test_seconds", "test", ("host",), buckets=(0.1, 1))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5, "a")
+        assert histogram.render().splitlines()[2:] == [
+            'test_seconds_bucket{host="a",le="0.1"} 1',
+            'test_seconds_bucket{host="a",le="1"} 2',
+            'test_seconds_bucket{host="a",le="+Inf"} 3',
+            'test_seconds_sum{host="a"} 5.55',
+            'test_seconds_count{host="a"} 3',
+        ]
+
+
+class TestMetricsRoute:
+    @staticmethod
+    def test_scrape(render: RenderArticle, prefetcher: Prefetcher, monkeypatch):
+        monkeypatch.setattr(env_config, "METRICS", True)
+        web_app = WebApp()
+        ArticlePlugin(web_app, render, prefetcher)
+        MetricsPlugin(web_app, render, render.refresh_queue, prefetcher)
+        client = TestClient(web_app.app, follow_redirects=False)
+        assert client.get("/posts/1").status_code == 200
+        assert client.get("/posts/404").status_code == 302
+        text = client.get("/metrics").text
+        assert 'fixfanbox_requests_total{route="/posts/{post_id}",status="200"}' in text
+        assert 'fixfanbox_redirects_total{reason="not_found"}' in text
+        assert 'fixfanbox_stage_seconds_count{stage="render"}' in text
+        assert 'fixfanbox_cache_requests_total{cache="post",result="hits"}' in text
+        assert 'fixfanbox_cache_entries{cache="page"} 1' in text
@@ -0,0 +1,40 @@
+import json
+
+from src.api.models import (
+    FanboxPost,
+    FanboxPostBodyBlock,
+    FanboxPostBodyBlockType,
+    FanboxPostResponse,
+)
+from tests.conftest import make_post_data
+
+
+class TestFanboxPostBodyBlock:
+    @staticmethod
+    def test_known_type():
+        block = FanboxPostBodyBlock(type="image", imageId="img1")
+        assert block.type is FanboxPostBodyBlockType.IMAGE
+        assert block.raw_type == "image"
+
+    @staticmethod
+    def test_enum_type():
+        block = FanboxPostBodyBlock(type=FanboxPostBodyBlockType.P, text="a")
+        assert block.raw_type == "p"
+
+    @staticmethod
+    def test_unknown_type_keeps_raw_type():
+        block = FanboxPostBodyBlock.model_validate_json('{"type": "file"}')
+        assert block.type is FanboxPostBodyBlockType.UNKNOWN
+        assert block.raw_type == "file"
+        again = FanboxPostBodyBlock.model_validate_json(block.model_dump_json())
+        assert again == block
+
+
+class TestFanboxPostResponse:
+    @staticmethod
+    def test_validate_json_matches_dict():
+        data = make_post_data()
+        raw = json.dumps({"body": data}).encode()
+        post = FanboxPostResponse.model_validate_json(raw).body
+        assert post == FanboxPost(**data)
+        assert post.body.blocks[1].type is FanboxPostBodyBlockType.IMAGE
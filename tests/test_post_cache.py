@@ -0,0 +1,51 @@
+import time
+
+from src.api.cache import CacheEntry, LRUCache, PostCache, SQLiteStore
+from src.api.models import FanboxPost
+from src.env import env_config
+
+
+class TestLRUCache:
+    @staticmethod
+    def test_eviction():
+        cache = LRUCache(2)
+        for key in ("a", "b"):
+            cache.set(key, CacheEntry(key, 0, 1))
+        cache.get("a")
+        cache.set("c", CacheEntry("c", 0, 1))
+        assert cache.get("b") is None
+        assert cache.get("a").value == "a"
+        assert cache.evictions == 1
+
+
+class TestPostCache:
+    @staticmethod
+    def test_hit_and_miss(post: FanboxPost):
+        cache = PostCache()
+        assert cache.get(post.id) is None
+        cache.set(post)
+        assert cache.get(post.id) is post
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    @staticmethod
+    def test_fee_ttl(post: FanboxPost, paid_post: FanboxPost):
+        assert PostCache.get_ttl(post) == env_config.POST_CACHE_TTL
+        assert PostCache.get_ttl(paid_post) == env_config.POST_CACHE_FEE_TTL
+
+    @staticmethod
+    def test_expired(post: FanboxPost):
+        cache = PostCache()
+        cache.memory.set(post.id, CacheEntry(post, 0, time.time() - 1))
+        assert cache.get(post.id) is None
+
+    @staticmethod
+    def test_disk_store(post: FanboxPost, tmp_path):
+        cache = PostCache()
+        cache.store = SQLiteStore(str(tmp_path / "cache.db"))
+        cache.set(post)
+        cache.memory = LRUCache(8)
+        cached = cache.get(post.id)
+        assert cached == post
+        assert cache.stats["disk_hits"] == 1
+        cache.store.close()
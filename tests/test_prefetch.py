@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api.prefetch import Prefetcher, parse_warm_up_items
+from src.core.web_app import WebApp
+from src.env import env_config
+from src.route.warm_up import WarmUpPlugin
+
+from tests.conftest import FakeFanBoxApi
+
+
+@pytest.mark.asyncio
+class TestPrefetcher:
+    @staticmethod
+    async def test_neighbours(
+        prefetcher: Prefetcher, fanbox_api: FakeFanBoxApi, monkeypatch
+    ):
+        monkeypatch.setattr(env_config, "PREFETCH", True)
+        fanbox_api.next_posts["1"] = "2"
+        await prefetcher.render.get_post_info("1")
+        prefetcher.prefetch("1")
+        prefetcher.prefetch("1")
+        assert list(prefetcher.queue.tasks) == ["2"]
+        await asyncio.gather(*prefetcher.queue.tasks.values())
+        assert prefetcher.is_cached("2")
+        assert fanbox_api.calls == 2
+        prefetcher.prefetch("1")
+        assert len(prefetcher.queue) == 0
+
+    @staticmethod
+    async def test_disabled(prefetcher: Prefetcher, fanbox_api: FakeFanBoxApi):
+        fanbox_api.next_posts["1"] = "2"
+        await prefetcher.render.get_post_info("1")
+        prefetcher.prefetch("1")
+        assert len(prefetcher.queue) == 0
+
+    @staticmethod
+    async def test_creator_posts_once_per_interval(
+        prefetcher: Prefetcher, fanbox_api: FakeFanBoxApi, monkeypatch
+    ):
+        monkeypatch.setattr(env_config, "PREFETCH", True)
+        monkeypatch.setattr(env_config, "PREFETCH_CREATOR_POSTS", 2)
+        fanbox_api.creator_posts = ["3", "4", "5"]
+        await prefetcher.render.get_post_info("1")
+        prefetcher.prefetch("1")
+        assert prefetcher.prefetch_creator("miyuuu") is False
+        await asyncio.gather(*prefetcher.queue.tasks.values())
+        await asyncio.gather(*prefetcher.queue.tasks.values())
+        assert prefetcher.is_cached("3") and prefetcher.is_cached("4")
+        assert not prefetcher.is_cached("5")
+
+    @staticmethod
+    async def test_warm_up(prefetcher: Prefetcher, fanbox_api: FakeFanBoxApi):
+        items = parse_warm_up_items("1, 2\n404 @someone 1")
+        assert await prefetcher.warm_up(items) == 3
+        assert prefetcher.is_cached("1") and prefetcher.is_cached("2")
+        assert fanbox_api.get_user_id("someone") == "1234"
+
+
+class TestWarmUpRoute:
+    @staticmethod
+    def test_token(prefetcher: Prefetcher, monkeypatch):
+        monkeypatch.setattr(env_config, "WARM_UP_TOKEN", "secret")
+        web_app = WebApp()
+        WarmUpPlugin(web_app, prefetcher)
+        client = TestClient(web_app.app)
+        assert client.post("/warm-up", content="1 2").status_code == 403
+        resp = client.post(
+            "/warm-up", content="1 2", headers={"Authorization": "Bearer secret"}
+        )
+        assert resp.status_code == 202
+        assert resp.json() == {"scheduled": 2}
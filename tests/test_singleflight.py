@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.api.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    @staticmethod
+    async def test_coalesce():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*[flight.do("1", fetch) for _ in range(10)])
+        assert results == [1] * 10
+        assert calls == 1
+        assert len(flight) == 0
+
+    @staticmethod
+    async def test_error_propagation():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *[flight.do("1", fetch) for _ in range(3)], return_exceptions=True
+        )
+        assert all(isinstance(i, ValueError) for i in results)
+        assert len(flight) == 0
+
+    @staticmethod
+    async def test_cancel_last_waiter():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(10)
+
+        waiter = asyncio.create_task(flight.do("1", fetch))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert len(flight) == 0
+
+    @staticmethod
+    async def test_cancel_one_waiter():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.create_task(flight.do("1", fetch))
+        second = asyncio.create_task(flight.do("1", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "ok"
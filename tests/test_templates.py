@@ -0,0 +1,18 @@
+import filecmp
+import os
+
+from src import COMPILED_TEMPLATE_PATH, template_env
+from src.compile_templates import compile_templates
+
+
+def test_compiled_templates_up_to_date(tmp_path):
+    compile_templates(str(tmp_path))
+    compiled = sorted(os.listdir(tmp_path))
+    assert compiled == sorted(os.listdir(COMPILED_TEMPLATE_PATH))
+    _, mismatch, errors = filecmp.cmpfiles(tmp_path, COMPILED_TEMPLATE_PATH, compiled)
+    assert not mismatch and not errors, "run python -m src.compile_templates"
+
+
+def test_template_env_loads_compiled():
+    template = template_env.get_template("article.jinja2")
+    assert template.filename is None
@@ -0,0 +1,49 @@
+import importlib
+import pkgutil
+
+import pytest
+from persica.factory.component import BaseComponent
+from starlette.testclient import TestClient
+
+import src.api
+import src.route
+import worker
+
+
+def get_components(package):
+    for module_info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f"{package.__name__}.{module_info.name}")
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, BaseComponent)
+                and value.__module__ == module.__name__
+            ):
+                yield value
+
+
+def test_worker_registers_every_plugin():
+    assert set(get_components(src.route)) <= set(worker.PLUGINS)
+
+
+def test_worker_builds_every_api_component():
+    assert set(get_components(src.api)) <= set(worker.container.objects)
+
+
+@pytest.mark.asyncio
+class TestContainer:
+    @staticmethod
+    async def test_singletons():
+        from src.api.httpxrequest import HTTPXRequest
+        from src.api.render import RenderArticle
+
+        container = worker.container
+        render = container.get(RenderArticle)
+        assert render.fanbox_api.httpx_request is container.get(HTTPXRequest)
+        assert render.kemono_api.httpx_request is container.get(HTTPXRequest)
+
+
+def test_worker_lifespan():
+    with TestClient(worker.app, follow_redirects=False) as client:
+        response = client.get("/posts/1", headers={"User-Agent": "curl"})
+    assert response.status_code == 302
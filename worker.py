@@ -1,15 +1,29 @@
-from persica.applicationbuilder import ApplicationBuilder
-from persica.context.application import ApplicationContext
-
+# Serverless entry point. Components are wired explicitly instead of scanned
+# with persica, which imports every package on each cold start.
+# benchmarks/bench_startup.py measures the import cost.
+from src.core.container import Container
 from src.core.web_app import WebApp
+from src.route.article import ArticlePlugin
+from src.route.base import BaseRoutePlugin
+from src.route.batch import BatchPlugin
+from src.route.error import ErrorRoutePlugin
+from src.route.image import ImageRoutePlugin
+from src.route.metrics import MetricsPlugin
+from src.route.warm_up import WarmUpPlugin
 
-application = (
-    ApplicationBuilder()
-    .set_application_context_class(ApplicationContext)
-    .set_scanner_packages(["src.core", "src.api", "src.route"])
-    .build()
+PLUGINS = (
+    WebApp,
+    BaseRoutePlugin,
+    ErrorRoutePlugin,
+    ArticlePlugin,
+    BatchPlugin,
+    ImageRoutePlugin,
+    MetricsPlugin,
+    WarmUpPlugin,
 )
-application.context.run()
-application.loop.create_task(application.initialize())
-web_app: WebApp = application.factory.get_object(WebApp)
+
+container = Container(PLUGINS)
+web_app: WebApp = container.get(WebApp)
 app = web_app.app
+app.add_event_handler("startup", container.initialize)
+app.add_event_handler("shutdown", container.shutdown)